@@ -0,0 +1,134 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+JARVIS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# --- MICRO-BATCHING BENCH (THROUGHPUT AND LATENCY PER JARVIS_BATCH_WINDOW_MS) ---
+# boot.py reads the batch settings at import, so every window runs in its own subprocess. Inside it a real
+# CognitiveCore answers bursts of queued messages against a stand-in ollama whose chat takes a fixed time and
+# serves at most `slots` calls at once (OLLAMA_NUM_PARALLEL). The cycle loop is the inference worker's:
+# back-to-back while there is work, IDLE sleep otherwise. Latency runs from queue_user_message to post_reply.
+
+
+class FixedLatencyOllama:
+    def __init__(self, chat_ms, slots):
+        self.chat_ms = chat_ms
+        self.slots = threading.BoundedSemaphore(slots)
+
+    def list(self):
+        import boot
+        return {"models": [{"name": boot.MODEL_NAME}]}
+
+    def embeddings(self, model, prompt):
+        raise ConnectionError("no embedder in this bench")
+
+    def chat(self, model, messages, options=None, stream=False):
+        with self.slots:
+            time.sleep(self.chat_ms / 1000.0)
+        reply = {"message": {"content": "ok"}, "done": True, "done_reason": "stop", "prompt_eval_count": 200, "eval_count": 20}
+        return iter([reply]) if stream else reply
+
+
+def _percentile(sorted_values, q):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+
+def worker(args):
+    sys.path.insert(0, JARVIS_DIR)
+    import boot
+
+    boot.ollama = FixedLatencyOllama(args.chat_ms, args.slots)
+    boot.prepare_workspace()
+    brain = boot.CognitiveCore()
+    brain.initialize()
+
+    queued_at, replied_at = {}, {}
+    post_reply = brain.post_reply
+
+    def timed_post_reply(reply, in_reply_to=None):
+        replied_at[in_reply_to] = time.perf_counter()
+        return post_reply(reply, in_reply_to=in_reply_to)
+
+    brain.post_reply = timed_post_reply
+
+    def producer():
+        sent = 0
+        while sent < args.messages:
+            for _ in range(min(args.burst, args.messages - sent)):
+                queued = brain.queue_user_message(f"bench question {sent}", sender="BENCH")
+                queued_at[queued["id"]] = time.perf_counter()
+                sent += 1
+            time.sleep(args.gap_ms / 1000.0)
+
+    started = time.perf_counter()
+    threading.Thread(target=producer, daemon=True).start()
+    while len(replied_at) < args.messages and time.perf_counter() - started < args.max_sec:
+        if not brain.process_cycle("Vision Disabled"):
+            time.sleep(args.idle_ms / 1000.0)
+    elapsed = time.perf_counter() - started
+    latencies = sorted((replied_at[i] - queued_at[i]) * 1000.0 for i in replied_at if i in queued_at)
+    print(json.dumps({
+        "answered": len(latencies),
+        "elapsed": elapsed,
+        "p50": _percentile(latencies, 0.5),
+        "p99": _percentile(latencies, 0.99),
+        "batches": brain.batch_stats["batches"],
+        "largest": brain.batch_stats["largest"],
+    }))
+    os._exit(0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Throughput and latency of queued messages at several batch windows")
+    parser.add_argument("--windows", default="0,25,50,100,200", help="Comma-separated JARVIS_BATCH_WINDOW_MS values")
+    parser.add_argument("--batch-max", type=int, default=4)
+    parser.add_argument("--messages", type=int, default=48)
+    parser.add_argument("--burst", type=int, default=6, help="Messages queued together")
+    parser.add_argument("--gap-ms", type=float, default=300.0, help="Pause between bursts")
+    parser.add_argument("--chat-ms", type=float, default=400.0, help="Fixed model call time")
+    parser.add_argument("--slots", type=int, default=4, help="Concurrent chats the stand-in serves")
+    parser.add_argument("--idle-ms", type=float, default=250.0, help="Cycle loop sleep when there is no work")
+    parser.add_argument("--max-sec", type=float, default=300.0)
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.worker:
+        worker(args)
+        return
+
+    print(f"{args.messages} messages in bursts of {args.burst} every {args.gap_ms:.0f} ms, "
+          f"chat {args.chat_ms:.0f} ms, {args.slots} slots, batch max {args.batch_max}")
+    print(f"{'window ms':>10}{'answered':>10}{'msg/s':>8}{'p50 ms':>10}{'p99 ms':>10}{'batches':>9}{'largest':>9}")
+    passthrough = [
+        f"--{name.replace('_', '-')}={getattr(args, name)}"
+        for name in ("messages", "burst", "gap_ms", "chat_ms", "slots", "idle_ms", "max_sec")
+    ]
+    for window in [w.strip() for w in args.windows.split(",") if w.strip()]:
+        with tempfile.TemporaryDirectory(prefix="jarvis-batch-bench-") as workspace:
+            env = dict(
+                os.environ, JARVIS_WORKSPACE=workspace, JARVIS_BATCH_WINDOW_MS=window,
+                JARVIS_BATCH_MAX=str(args.batch_max), JARVIS_ROLE="all",
+            )
+            out = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), "--worker", *passthrough],
+                env=env, capture_output=True, text=True,
+            )
+            if out.returncode != 0:
+                print(f"{window:>10}  failed:\n{out.stderr[-2000:]}")
+                continue
+            r = json.loads(out.stdout.strip().splitlines()[-1])
+            print(
+                f"{window:>10}{r['answered']:>10}{r['answered'] / r['elapsed']:>8.2f}"
+                f"{r['p50']:>10.0f}{r['p99']:>10.0f}{r['batches']:>9}{r['largest']:>9}"
+            )
+
+
+if __name__ == "__main__":
+    main()
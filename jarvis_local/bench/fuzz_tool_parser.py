@@ -0,0 +1,145 @@
+import argparse
+import math
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tool_parser import MULTILINE_TOOLS, TOOL_ARITY, parse_tool_calls
+
+# --- TOOL PARSER FUZZ + SCALING BENCH ---
+# Round-trip: random well-formed tags hidden in noise, some preceded by a truncated tag, must come back exactly, in order.
+# Garbage: random token soup must never raise and every call must have its tool's arity.
+# Scaling: adversarial shapes are timed at doubling sizes; the fitted exponent must stay near 1 (linear).
+ARG_ALPHABET = list("abcXYZ019 ,:;[]{}()\n\t=+-_.'") + ['"', "“", "”", ", ", "]", '",', '"]']
+NOISE_ALPHABET = list("abc xyz 0123456789 .,;:()\n") + ["[", "]", "[x", "[ foo]", '"', "“", "”", "\\"]
+SOUP_TOKENS = (
+    ["[", "]", '"', ",", ", ", "\\", '\\"', "“", "”", ":", " ", "\n", "x", "SEARCH", "BUILD", "HTTP"]
+    + [f"[{name}: " for name in TOOL_ARITY] + [f"[{name}]" for name in TOOL_ARITY]
+)
+ADVERSARIAL = {
+    "unterminated_build": lambda n: '[BUILD: "' * (n // 9),
+    "quote_flood": lambda n: '[SEARCH: "' + '"' * n,
+    "comma_quotes": lambda n: '[HTTP: "' + '" x' * (n // 3),
+    "backslash_run": lambda n: '[READ: "' + "\\" * n + '"',
+    "open_brackets": lambda n: "[" * n,
+    "half_args": lambda n: '[HTTP: "a", "b", ' * (n // 16),
+    "many_calls": lambda n: '[SEARCH: "q"] ' * (n // 14),
+    "truncated_then_valid": lambda n: '[SEARCH: "abc\nthen [READ: "http://x"] ' * (n // 38),
+}
+
+
+def _escape(value):
+    for quote in ('"', "“", "”"):
+        value = value.replace(quote, "\\" + quote)
+    return value
+
+
+def _random_call(rng):
+    name = rng.choice(sorted(TOOL_ARITY))
+    args = ["".join(rng.choice(ARG_ALPHABET) for _ in range(rng.randint(0, 24))) for _ in range(TOOL_ARITY[name])]
+    if name not in MULTILINE_TOOLS:
+        args = [a.replace("\n", " ") for a in args]
+    if not args:
+        return name, args, f"[{name}]"
+    return name, args, f"[{name}: " + ", ".join(f'"{_escape(a)}"' for a in args) + "]"
+
+
+def _truncated(rng):
+    # A tag cut off mid-argument (the model stopped or changed its mind); it must not swallow the next tag.
+    name = rng.choice(sorted(n for n, arity in TOOL_ARITY.items() if arity))
+    partial = "".join(rng.choice("abc xyz:/.") for _ in range(rng.randint(0, 12)))
+    return f'[{name}: "{partial}' + rng.choice(["", " ", "\n", "\nthen "])
+
+
+def _noise(rng, size):
+    # Noise may hold stray quotes but never a bare backslash right before the next tag's opening quote.
+    return "".join(rng.choice(NOISE_ALPHABET) for _ in range(size)).replace("\\", "") + " "
+
+
+def fuzz_round_trip(rng, iterations):
+    for i in range(iterations):
+        expected, parts = [], [_noise(rng, rng.randint(0, 40))]
+        for _ in range(rng.randint(0, 6)):
+            name, args, tag = _random_call(rng)
+            expected.append((name, args))
+            if rng.random() < 0.2:
+                parts.append(_truncated(rng))
+            parts.append(tag)
+            parts.append(_noise(rng, rng.randint(0, 40)))
+        text = "".join(parts)
+        got = [(call.name, call.args) for call in parse_tool_calls(text)]
+        if got != expected:
+            return f"round trip #{i} mismatch\ninput: {text!r}\nexpected: {expected!r}\ngot: {got!r}"
+    return None
+
+
+def fuzz_garbage(rng, iterations):
+    for i in range(iterations):
+        text = "".join(rng.choice(SOUP_TOKENS) for _ in range(rng.randint(0, 200)))
+        try:
+            calls = parse_tool_calls(text)
+        except Exception as exc:
+            return f"garbage #{i} raised {exc!r}\ninput: {text!r}"
+        last_end = 0
+        for call in calls:
+            if len(call.args) != TOOL_ARITY[call.name] or call.start < last_end or call.end <= call.start:
+                return f"garbage #{i} produced a malformed call {call!r}\ninput: {text!r}"
+            last_end = call.end
+    return None
+
+
+def _best_time(text, repeats):
+    best = math.inf
+    for _ in range(repeats):
+        started = time.perf_counter()
+        parse_tool_calls(text)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def bench_scaling(base_size, doublings, repeats):
+    rows = []
+    for shape, build in ADVERSARIAL.items():
+        sizes, times = [], []
+        for k in range(max(1, doublings) + 1):
+            text = build(base_size << k)
+            sizes.append(len(text))
+            times.append(_best_time(text, repeats))
+        # Least-squares slope of log(time) over log(size): 1.0 is linear, 2.0 quadratic.
+        xs, ys = [math.log(s) for s in sizes], [math.log(max(t, 1e-7)) for t in times]
+        mx, my = sum(xs) / len(xs), sum(ys) / len(ys)
+        slope = sum((x - mx) * (y - my) for x, y in zip(xs, ys)) / sum((x - mx) ** 2 for x in xs)
+        rows.append((shape, sizes[-1], times[-1] * 1000.0, sizes[-1] / times[-1] / 1e6, slope))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fuzz and benchmark tool_parser.parse_tool_calls")
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--iterations", type=int, default=5000)
+    parser.add_argument("--base-size", type=int, default=20000, help="Smallest adversarial input, in chars")
+    parser.add_argument("--doublings", type=int, default=4)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--max-exponent", type=float, default=1.3, help="Fail when any shape scales worse than this")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    failures = [f for f in (fuzz_round_trip(rng, args.iterations), fuzz_garbage(rng, args.iterations)) if f]
+    print(f"fuzz: {2 * args.iterations} cases, seed={args.seed}, {len(failures)} failures")
+    for failure in failures:
+        print(failure)
+
+    print(f"{'shape':<20}{'chars':>12}{'ms':>10}{'Mchar/s':>10}{'exponent':>10}")
+    for shape, chars, ms, rate, slope in bench_scaling(args.base_size, args.doublings, args.repeats):
+        flag = "" if slope <= args.max_exponent else "  <-- superlinear"
+        print(f"{shape:<20}{chars:>12}{ms:>10.1f}{rate:>10.2f}{slope:>10.2f}{flag}")
+        if flag:
+            failures.append(shape)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
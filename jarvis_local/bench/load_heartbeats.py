@@ -0,0 +1,193 @@
+import argparse
+import os
+import random
+import socket
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+
+import requests
+
+COORDINATOR_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "mac_agi", "coordinator")
+sys.path.insert(0, COORDINATOR_DIR)
+
+from storage import HeartbeatBuffer, NodeStore
+
+# --- HIVE COORDINATOR HEARTBEAT LOAD TEST ---
+# store:  many threads call HeartbeatBuffer.record while the flusher writes one transaction per interval.
+# legacy: the pre-pool path (connect, UPDATE, commit, close per beat, rollback journal) for comparison.
+# http:   a real uvicorn coordinator on a temp DB, driven over HTTP with single and bulk heartbeats.
+API_KEY = "bench-key"
+
+
+def _now():
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _register_direct(store, nodes):
+    now = _now()
+    for i in range(nodes):
+        store.upsert_node(f"node_{i:012x}", {
+            "node_id": f"bench-{i}",
+            "node_label": f"bench {i}",
+            "platform": "darwin",
+            "workspace": "/tmp",
+            "capabilities": ["ocr"] if i % 3 else ["ocr", "gpu"],
+            "consent": {"telemetry": True},
+        }, now)
+
+
+def _drive(threads, seconds, beat):
+    # Runs `beat(rng)` in a tight loop on every thread; returns (beats, per-beat latencies in ms).
+    stop = time.monotonic() + seconds
+    counts, latencies = [0] * threads, [[] for _ in range(threads)]
+
+    def worker(index):
+        rng = random.Random(index)
+        while time.monotonic() < stop:
+            started = time.perf_counter()
+            counts[index] += beat(rng)
+            latencies[index].append((time.perf_counter() - started) * 1000.0)
+
+    pool = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    return sum(counts), sorted(ms for per_thread in latencies for ms in per_thread)
+
+
+def _percentile(sorted_values, q):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+
+def _report(label, beats, seconds, latencies, extra=""):
+    print(
+        f"{label:<16}{beats:>10}{beats / seconds:>12.0f}"
+        f"{_percentile(latencies, 0.5):>10.2f}{_percentile(latencies, 0.99):>10.2f}  {extra}"
+    )
+
+
+def run_store(db_path, args):
+    store = NodeStore(db_path)
+    store.init_schema()
+    _register_direct(store, args.nodes)
+    buffer = HeartbeatBuffer(store, flush_interval_sec=args.flush_sec)
+    buffer.start()
+    beats, latencies = _drive(
+        args.threads, args.seconds,
+        lambda rng: len(buffer.record([f"bench-{rng.randrange(args.nodes)}"], _now())[0]),
+    )
+    buffer.stop()
+    stats = buffer.stats()
+    store.close()
+    _report("store", beats, args.seconds, latencies, f"flushes={stats['flushes']} flushed_beats={stats['flushed_beats']}")
+
+
+def run_legacy(db_path, args):
+    store = NodeStore(db_path)
+    store.init_schema()
+    _register_direct(store, args.nodes)
+    store.close()
+    conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA journal_mode = DELETE")
+    conn.close()
+
+    def beat(rng):
+        conn = sqlite3.connect(db_path, timeout=30.0)
+        try:
+            now = _now()
+            conn.execute("UPDATE nodes SET last_seen_at = ?, updated_at = ? WHERE node_id = ?",
+                         (now, now, f"bench-{rng.randrange(args.nodes)}"))
+            conn.commit()
+        finally:
+            conn.close()
+        return 1
+
+    beats, latencies = _drive(args.threads, args.seconds, beat)
+    _report("legacy", beats, args.seconds, latencies, "connect+commit per beat, rollback journal")
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def run_http(db_path, args):
+    port = _free_port()
+    env = dict(os.environ, HIVE_DB_PATH=db_path, HIVE_API_KEY=API_KEY, HIVE_HEARTBEAT_FLUSH_SEC=str(args.flush_sec))
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app:app", "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        cwd=COORDINATOR_DIR, env=env,
+    )
+    base = f"http://127.0.0.1:{port}"
+    headers = {"Authorization": f"Bearer {API_KEY}"}
+    try:
+        for _ in range(100):
+            try:
+                if requests.get(f"{base}/health", timeout=1).ok:
+                    break
+            except requests.RequestException:
+                time.sleep(0.1)
+        session = requests.Session()
+        started = time.perf_counter()
+        for i in range(args.nodes):
+            session.post(f"{base}/api/v1/nodes/register", headers=headers, json={
+                "node_id": f"bench-{i}", "node_label": f"bench {i}", "platform": "darwin", "workspace": "/tmp",
+                "capabilities": ["ocr"],
+            }).raise_for_status()
+        print(f"registered {args.nodes} nodes over HTTP in {time.perf_counter() - started:.1f}s")
+        local = threading.local()
+
+        def client():
+            if not hasattr(local, "session"):
+                local.session = requests.Session()
+            return local.session
+
+        def single(rng):
+            res = client().post(f"{base}/api/v1/nodes/bench-{rng.randrange(args.nodes)}/heartbeat", headers=headers)
+            return 1 if res.ok else 0
+
+        def bulk(rng):
+            ids = [f"bench-{rng.randrange(args.nodes)}" for _ in range(args.bulk_size)]
+            res = client().post(f"{base}/api/v1/nodes/heartbeat", headers=headers, json={"node_ids": ids})
+            return res.json().get("accepted", 0) if res.ok else 0
+
+        beats, latencies = _drive(args.threads, args.seconds, single)
+        _report("http single", beats, args.seconds, latencies, "latency is per request")
+        beats, latencies = _drive(args.threads, args.seconds, bulk)
+        _report("http bulk", beats, args.seconds, latencies, f"{args.bulk_size} nodes per request")
+        print("health:", requests.get(f"{base}/health", timeout=5).json().get("heartbeats"))
+    finally:
+        server.terminate()
+        server.wait(timeout=10)
+
+
+MODES = {"store": run_store, "legacy": run_legacy, "http": run_http}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Heartbeat throughput for the hive coordinator at thousands of nodes")
+    parser.add_argument("--nodes", type=int, default=5000)
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--flush-sec", type=float, default=2.0)
+    parser.add_argument("--bulk-size", type=int, default=500)
+    parser.add_argument("--modes", default="store,legacy,http", help=f"Comma-separated subset of {','.join(MODES)}")
+    args = parser.parse_args()
+
+    print(f"{'mode':<16}{'beats':>10}{'beats/s':>12}{'p50 ms':>10}{'p99 ms':>10}")
+    with tempfile.TemporaryDirectory(prefix="hive-bench-") as tmp:
+        for mode in [m.strip() for m in args.modes.split(",") if m.strip()]:
+            MODES[mode](os.path.join(tmp, f"{mode}.db"), args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import zlib
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("JARVIS_WORKSPACE", tempfile.mkdtemp(prefix="jarvis-recall-bench-"))
+
+import numpy
+
+import boot
+
+# --- KNOWLEDGE CORTEX RECALL BENCH (BM25 / VECTOR / FUSED, EMBEDDER UP AND DOWN) ---
+# Every memory is a handful of "concepts"; each concept has several surface forms (synonyms). A query names some
+# of its target memory's concepts, often through a different synonym, so BM25 misses what the embedder catches,
+# while the embedder's noise blurs near neighbours that exact terms separate. Each query has exactly one relevant
+# memory, so recall@k is the share of queries whose target is in the top k.
+FILLER = "the a of to and in for on with about note remember that this from".split()
+
+
+def _word(concept, form):
+    return f"c{concept}x{form}"
+
+
+class FakeEmbedder:
+    # Deterministic stand-in for ollama.embeddings: a text embeds to the sum of its concepts' vectors plus
+    # per-surface-form noise, and every call sleeps `latency_ms` like a local embed round-trip.
+    def __init__(self, dim, noise, latency_ms):
+        self.dim = dim
+        self.noise = noise
+        self.latency_ms = latency_ms
+        self.down = False
+
+    def _vector(self, seed, scale=1.0):
+        return numpy.random.RandomState(zlib.crc32(seed.encode())).standard_normal(self.dim) * scale
+
+    def embed(self, text):
+        total = numpy.zeros(self.dim)
+        for token in text.split():
+            if token.startswith("c") and "x" in token:
+                concept = token.split("x")[0]
+                total += self._vector(concept) + self._vector(token, self.noise)
+        return total.tolist()
+
+    def embeddings(self, model, prompt):
+        if self.down:
+            raise ConnectionError("embed model unavailable")
+        time.sleep(self.latency_ms / 1000.0)
+        return {"embedding": self.embed(prompt)}
+
+
+def build_corpus(rng, args):
+    docs, queries = [], []
+    for doc_id in range(1, args.docs + 1):
+        concepts = rng.sample(range(args.concepts), args.doc_concepts)
+        words = [_word(c, rng.randrange(args.synonyms)) for c in concepts] + rng.sample(FILLER, 4)
+        rng.shuffle(words)
+        docs.append((doc_id, " ".join(words), concepts))
+    for doc_id, _, concepts in rng.sample(docs, min(args.queries, len(docs))):
+        words = [_word(c, rng.randrange(args.synonyms)) for c in rng.sample(concepts, args.query_concepts)]
+        words.append(_word(rng.randrange(args.concepts), rng.randrange(args.synonyms)))
+        queries.append((" ".join(words), doc_id))
+    return docs, queries
+
+
+def load_cortex(docs, embedder):
+    entries = [
+        {"id": doc_id, "text": text, "time": "bench", "count": 1, "hits": 0, "vec": embedder.embed(text)}
+        for doc_id, text, _ in docs
+    ]
+    cortex = boot.KnowledgeCortex()
+    with open(boot.PATHWAYS_FILE, "w") as f:
+        json.dump(entries, f)
+    started = time.perf_counter()
+    cortex.load()
+    return cortex, (time.perf_counter() - started) * 1000.0
+
+
+def _percentile(sorted_values, q):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+
+def run(cortex, embedder, queries, mode, down, k):
+    boot.RECALL_MODE = mode
+    embedder.down = down
+    cortex.embed_down_until, cortex.embed_ms = 0.0, None
+    before = dict(cortex.recall_counts)
+    by_text = {entry["text"]: doc_id for doc_id, entry in cortex.pathways.items()}
+    hits_1 = hits_k = 0
+    latencies = []
+    for query, target in queries:
+        started = time.perf_counter()
+        ranked = [by_text[text] for text in cortex.recall(query, top_k=k)]
+        latencies.append((time.perf_counter() - started) * 1000.0)
+        hits_1 += bool(ranked) and ranked[0] == target
+        hits_k += target in ranked
+    latencies.sort()
+    paths = {path: count - before[path] for path, count in cortex.recall_counts.items() if count > before[path]}
+    return hits_1 / len(queries), hits_k / len(queries), latencies, paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Latency and recall@k of KnowledgeCortex.recall on a labelled synthetic corpus")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--docs", type=int, default=5000)
+    parser.add_argument("--queries", type=int, default=300)
+    parser.add_argument("--concepts", type=int, default=4000)
+    parser.add_argument("--synonyms", type=int, default=3, help="Surface forms per concept")
+    parser.add_argument("--doc-concepts", type=int, default=6)
+    parser.add_argument("--query-concepts", type=int, default=3)
+    parser.add_argument("--dim", type=int, default=128)
+    parser.add_argument("--noise", type=float, default=1.5, help="Per-synonym embedding noise, relative to a concept")
+    parser.add_argument("--embed-ms", type=float, default=15.0, help="Simulated embed round-trip")
+    parser.add_argument("-k", type=int, default=5)
+    args = parser.parse_args()
+
+    # Every query must run the full path: no recall or embed cache hits between modes.
+    boot.RECALL_CACHE_SIZE = 0
+    boot.EMBED_CACHE_SIZE = 0
+    boot.RECALL_MMR_LAMBDA = 0
+    embedder = FakeEmbedder(args.dim, args.noise, args.embed_ms)
+    boot.ollama = embedder
+    docs, queries = build_corpus(random.Random(args.seed), args)
+    cortex, load_ms = load_cortex(docs, embedder)
+    print(f"{len(docs)} memories loaded in {load_ms:.0f} ms, {len(queries)} queries, embed latency {args.embed_ms:.0f} ms")
+
+    print(f"{'mode':<10}{'embedder':<10}{'recall@1':>10}{f'recall@{args.k}':>10}{'p50 ms':>10}{'p99 ms':>10}  paths")
+    for mode, down in (("lexical", False), ("vector", False), ("hybrid", False), ("hybrid", True), ("vector", True)):
+        r1, rk, latencies, paths = run(cortex, embedder, queries, mode, down, args.k)
+        used = " ".join(f"{path}={count}" for path, count in sorted(paths.items()))
+        print(
+            f"{mode:<10}{'down' if down else 'up':<10}{r1:>10.3f}{rk:>10.3f}"
+            f"{_percentile(latencies, 0.5):>10.2f}{_percentile(latencies, 0.99):>10.2f}  {used}"
+        )
+
+
+if __name__ == "__main__":
+    main()
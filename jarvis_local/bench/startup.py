@@ -0,0 +1,116 @@
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+JARVIS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# --- STARTUP BENCH (EAGER VS LAZY IMPORTS AND INITIALIZATION) ---
+# eager: the pre-lazy startup. Every optional subsystem is imported up front and initialize() (memory store load
+#        plus ollama.list) runs before the first request, so /status answers only once the node is ready.
+# lazy:  the current startup. Heavy modules load on first use and initialize() runs in the background, so
+#        /status answers right away and reports readiness separately.
+# Each run is a fresh interpreter. Times are measured from the first line of the worker and the best of
+# --repeats is kept. The stand-in ollama.list sleeps --list-ms, like a cold Ollama daemon.
+EAGER_MODULES = ["pytesseract", "PIL.Image", "bs4", "duckduckgo_search", "ollama", "requests", "uvicorn", "numpy"]
+
+
+class SlowListOllama:
+    def __init__(self, list_ms, model):
+        self.list_ms = list_ms
+        self.model = model
+
+    def list(self):
+        time.sleep(self.list_ms / 1000.0)
+        return {"models": [{"name": self.model}]}
+
+
+def worker(mode, list_ms):
+    started = time.perf_counter()
+    sys.path.insert(0, JARVIS_DIR)
+    missing = []
+    if mode == "eager":
+        import importlib
+        for name in EAGER_MODULES:
+            try:
+                importlib.import_module(name)
+            except ImportError:
+                missing.append(name)
+    import boot
+    imported = time.perf_counter()
+
+    boot.ollama = SlowListOllama(list_ms, boot.MODEL_NAME)
+    boot.prepare_workspace()
+    boot.brain = boot.CognitiveCore()
+    if mode == "eager":
+        boot.brain.initialize()
+    else:
+        threading.Thread(target=boot.brain.initialize, daemon=True).start()
+    boot.get_status()
+    status = time.perf_counter()
+    while not boot.brain.is_ready():
+        time.sleep(0.001)
+    ready = time.perf_counter()
+    print(json.dumps({
+        "import_ms": (imported - started) * 1000.0,
+        "status_ms": (status - started) * 1000.0,
+        "ready_ms": (ready - started) * 1000.0,
+        "missing": missing,
+    }))
+    os._exit(0)
+
+
+def seed_memory(workspace, memories, dim):
+    rng = random.Random(3)
+    os.makedirs(os.path.join(workspace, "memory_db"), exist_ok=True)
+    entries = [
+        {"id": i + 1, "text": f"memory {i} about topic {rng.randrange(500)}", "time": "bench", "count": 1, "hits": 0,
+         "vec": [rng.random() for _ in range(dim)]}
+        for i in range(memories)
+    ]
+    with open(os.path.join(workspace, "memory_db", "neural_pathways.json"), "w") as f:
+        json.dump(entries, f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="boot.py import and startup time, eager versus lazy")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--memories", type=int, default=2000, help="Seeded memory store size")
+    parser.add_argument("--dim", type=int, default=768, help="Seeded embedding width")
+    parser.add_argument("--list-ms", type=float, default=300.0, help="Stand-in ollama.list latency")
+    parser.add_argument("--worker", choices=["eager", "lazy"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.worker:
+        worker(args.worker, args.list_ms)
+        return
+
+    with tempfile.TemporaryDirectory(prefix="jarvis-startup-bench-") as workspace:
+        seed_memory(workspace, args.memories, args.dim)
+        env = dict(os.environ, JARVIS_WORKSPACE=workspace, JARVIS_ROLE="all")
+        print(f"{args.memories} memories x {args.dim} dims, ollama.list {args.list_ms:.0f} ms, best of {args.repeats}")
+        print(f"{'mode':<8}{'import ms':>11}{'/status ms':>12}{'ready ms':>10}")
+        for mode in ("eager", "lazy"):
+            runs = []
+            for _ in range(args.repeats):
+                out = subprocess.run(
+                    [sys.executable, os.path.abspath(__file__), "--worker", mode, f"--list-ms={args.list_ms}"],
+                    env=env, capture_output=True, text=True,
+                )
+                if out.returncode != 0:
+                    print(f"{mode:<8}  failed:\n{out.stderr[-2000:]}")
+                    break
+                runs.append(json.loads(out.stdout.strip().splitlines()[-1]))
+            if not runs:
+                continue
+            best = {key: min(r[key] for r in runs) for key in ("import_ms", "status_ms", "ready_ms")}
+            skipped = f"  (not installed: {', '.join(runs[0]['missing'])})" if runs[0]["missing"] else ""
+            print(f"{mode:<8}{best['import_ms']:>11.0f}{best['status_ms']:>12.0f}{best['ready_ms']:>10.0f}{skipped}")
+
+
+if __name__ == "__main__":
+    main()
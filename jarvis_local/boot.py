@@ -1,29 +1,39 @@
-import subprocess
-import pytesseract
-from PIL import Image
 import time
+BOOT_STARTED = time.perf_counter()
+import subprocess
 import os
 import sys
 import json
 import logging
-import ollama
-import math
+import importlib
+import heapq
 import re
-import requests
 import asyncio
 from datetime import datetime
-from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from collections import OrderedDict, deque
 import threading
-import uvicorn
-from fastapi import FastAPI, Body, Header, HTTPException
-from fastapi.responses import HTMLResponse
+import signal
+import fcntl
+from fastapi import FastAPI, Body, Header, HTTPException, Request
+from fastapi.responses import HTMLResponse, PlainTextResponse, Response
 from fastapi.middleware.cors import CORSMiddleware
-from bs4 import BeautifulSoup
 from emotion_engine import EmotionEngine
 from soul import SoulInjector
-from duckduckgo_search import DDGS
+from profiler import StackSampler, attach_profile, current_profile, cycle_profile, span
+from web_search import SearchCache, build_backend
+from tool_runtime import ToolExecutor
+from tool_parser import parse_tool_calls
+from memory_index import BM25Index, VectorIndex, mmr, reciprocal_rank_fusion
+from wire_format import VersionedState, json_response, parse_fields, project, wants
+from conversation import ContextSizer, ConversationStore, is_memory_error
+from broker import Broker
+from vision import IncrementalOCR, ScreenSource
+from retention import BudgetedLog, Codec, MessageRecord, TextInterner, ThoughtRecord, TraceRecord, read_snapshot, write_snapshot
 
 # --- CONFIGURATION ---
+# An unterminated block (generation cut off mid-thought) runs to the end of the text.
+THINK_BLOCK = re.compile(r"<think>.*?(?:</think>|\Z)", re.S)
 logging.basicConfig(level=logging.INFO, format='[SOVEREIGN-NODE] %(message)s')
 WORKSPACE = os.environ.get("JARVIS_WORKSPACE", os.path.dirname(os.path.abspath(__file__)))
 BROADER_WORKSPACE = os.path.dirname(WORKSPACE)
@@ -31,9 +41,52 @@ EXP_DIR = f"{WORKSPACE}/experiments"
 PATHWAYS_FILE = f"{WORKSPACE}/memory_db/neural_pathways.json"
 CHAT_FILE = f"{WORKSPACE}/AGI_BRIDGE.md"
 VAULT_FILE = f"{WORKSPACE}/DATA_VAULT.md"
-TEMP_IMG = f"{WORKSPACE}/vision_buffer.png"
+VISION_TILE_ROWS = int(os.environ.get("JARVIS_VISION_TILE_ROWS", "12"))
+VISION_TILE_COLS = int(os.environ.get("JARVIS_VISION_TILE_COLS", "1"))
+OCR_WORKERS = int(os.environ.get("JARVIS_OCR_WORKERS", "2"))
+WEB_CACHE_DIR = f"{WORKSPACE}/web_cache"
+SNAPSHOT_FILE = f"{WORKSPACE}/memory_db/runtime_snapshot.bin"
+SHUTDOWN_DRAIN_SEC = float(os.environ.get("JARVIS_SHUTDOWN_DRAIN_SEC", "20"))
+WEB_CACHE_TTL_SEC = int(os.environ.get("JARVIS_WEB_CACHE_TTL_SEC", "900"))
+WEB_CACHE_MAX_ENTRIES = int(os.environ.get("JARVIS_WEB_CACHE_MAX_ENTRIES", "512"))
+SEARCH_BACKEND = os.environ.get("JARVIS_SEARCH_BACKEND", "ddgs")
+SEARCH_FIXTURES = os.environ.get("JARVIS_SEARCH_FIXTURES", "")
+SEARCH_CACHE_TTL_SEC = int(os.environ.get("JARVIS_SEARCH_CACHE_TTL_SEC", "600"))
+TOOL_WORKERS = int(os.environ.get("JARVIS_TOOL_WORKERS", "2"))
+TOOL_QUEUE_MAX = int(os.environ.get("JARVIS_TOOL_QUEUE_MAX", "16"))
+MAX_TOOL_CALLS = int(os.environ.get("JARVIS_MAX_TOOL_CALLS", "8"))
+BATCH_WINDOW_MS = int(os.environ.get("JARVIS_BATCH_WINDOW_MS", "0"))
+BATCH_MAX = int(os.environ.get("JARVIS_BATCH_MAX", "4"))
+THOUGHTS_BUDGET_BYTES = int(os.environ.get("JARVIS_THOUGHTS_BUDGET_BYTES", str(8 * 1024 * 1024)))
+OUTBOX_BUDGET_BYTES = int(os.environ.get("JARVIS_OUTBOX_BUDGET_BYTES", str(4 * 1024 * 1024)))
+TRACE_BUDGET_BYTES = int(os.environ.get("JARVIS_TRACE_BUDGET_BYTES", str(4 * 1024 * 1024)))
+RETENTION_HOT_ITEMS = int(os.environ.get("JARVIS_RETENTION_HOT_ITEMS", "64"))
+RETENTION_CODEC = os.environ.get("JARVIS_RETENTION_CODEC", "zlib")
 MODEL_NAME = os.environ.get("JARVIS_MODEL", "deepseek-r1:1.5b")
 EMBED_MODEL = "nomic-embed-text"
+RECALL_MODE = os.environ.get("JARVIS_RECALL_MODE", "hybrid").strip().lower()
+EMBED_BUDGET_MS = float(os.environ.get("JARVIS_EMBED_BUDGET_MS", "1500"))
+EMBED_RETRY_SEC = float(os.environ.get("JARVIS_EMBED_RETRY_SEC", "60"))
+MEMORY_CAPACITY = int(os.environ.get("JARVIS_MEMORY_CAPACITY", "5000"))
+MEMORY_DEDUP_SIM = float(os.environ.get("JARVIS_MEMORY_DEDUP_SIM", "0.95"))
+MEMORY_HALF_LIFE_SEC = float(os.environ.get("JARVIS_MEMORY_HALF_LIFE_SEC", str(7 * 24 * 3600)))
+MEMORY_COMPACT_SEC = float(os.environ.get("JARVIS_MEMORY_COMPACT_SEC", "300"))
+# Recall hits only refresh hits/last_used; those alone rewrite the store at most this often.
+MEMORY_TOUCH_FLUSH_SEC = float(os.environ.get("JARVIS_MEMORY_TOUCH_FLUSH_SEC", "3600"))
+RECALL_MMR_LAMBDA = float(os.environ.get("JARVIS_RECALL_MMR_LAMBDA", "0"))
+RECALL_CACHE_SIZE = int(os.environ.get("JARVIS_RECALL_CACHE_SIZE", "128"))
+EMBED_CACHE_SIZE = int(os.environ.get("JARVIS_EMBED_CACHE_SIZE", "256"))
+HISTORY_TOKEN_BUDGET = int(os.environ.get("JARVIS_HISTORY_TOKENS", "600"))
+SUMMARY_AFTER_TURNS = int(os.environ.get("JARVIS_SUMMARY_AFTER_TURNS", "6"))
+CTX_MIN = int(os.environ.get("JARVIS_CTX_MIN", "512"))
+CTX_MAX = int(os.environ.get("JARVIS_CTX_MAX", "4096"))
+# operator_assist replies are capped at 180 words (~240 tokens) plus the STATUS/NEXT STEPS scaffolding.
+OUTPUT_TOKEN_BUDGETS = {
+    "default": int(os.environ.get("JARVIS_NUM_PREDICT", "384")),
+    "operator_assist": int(os.environ.get("JARVIS_OPERATOR_NUM_PREDICT", "320")),
+    "summary": int(os.environ.get("JARVIS_SUMMARY_NUM_PREDICT", "200")),
+}
+PREFETCH_ENABLED = os.environ.get("JARVIS_PREFETCH", "true").strip().lower() in ("1", "true", "yes", "on")
 FALLBACK_MODELS = [
     m.strip() for m in os.environ.get(
         "JARVIS_FALLBACK_MODELS",
@@ -43,6 +96,11 @@ FALLBACK_MODELS = [
 AUTONOMOUS_INTERVAL_SEC = int(os.environ.get("JARVIS_AUTONOMOUS_INTERVAL_SEC", "60"))
 AUTONOMOUS_ENABLED = os.environ.get("JARVIS_AUTONOMOUS_ENABLED", "false").strip().lower() in ("1", "true", "yes", "on")
 OPERATOR_KEY = os.environ.get("JARVIS_OPERATOR_KEY", "").strip()
+# Deployment role: "all" (single process), "api" (HTTP only) or "inference" (cycle loop only).
+# Any role other than "all" shares queue/outbox/trace/thoughts through the SQLite broker.
+ROLE = os.environ.get("JARVIS_ROLE", "all").strip().lower()
+BROKER_DB = os.environ.get("JARVIS_BROKER_DB", "").strip() or (f"{WORKSPACE}/broker.db" if ROLE != "all" else "")
+STATE_PUBLISH_IDLE_SEC = float(os.environ.get("JARVIS_STATE_PUBLISH_IDLE_SEC", "5"))
 
 app = FastAPI(title="Jarvis Sovereign Node")
 app.add_middleware(
@@ -54,73 +112,313 @@ app.add_middleware(
 
 # --- CLASSES ---
 
+class LazyModule:
+    # Defers heavy imports (ollama pulls in httpx/pydantic) until first attribute access.
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+    def __getattr__(self, attr):
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return getattr(self._module, attr)
+
+ollama = LazyModule("ollama")
+
+class DeadlineExceeded(Exception):
+    def __init__(self, stage):
+        super().__init__(f"deadline passed at {stage}")
+        self.stage = stage
+
 class VisionDaemon:
-    def capture(self):
-        try:
-            cmd = ["/usr/sbin/screencapture", "-x", "-R", "0,0,1920,1080", TEMP_IMG]
-            subprocess.run(cmd, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-            return True
-        except: return False
+    def __init__(self, source=None):
+        self.pipeline = IncrementalOCR(source or ScreenSource(), rows=VISION_TILE_ROWS, cols=VISION_TILE_COLS, workers=OCR_WORKERS)
     def analyze(self):
-        if self.capture():
-            try: return pytesseract.image_to_string(Image.open(TEMP_IMG)).strip()
-            except: return ""
-        return ""
+        try: return self.pipeline.analyze()
+        except: return ""
+    def stats(self):
+        return dict(self.pipeline.stats)
 
 class KnowledgeCortex:
     def __init__(self):
-        self.pathways = []
+        self.pathways = {}
+        self.by_text = {}
+        self.next_id = 1
+        self.lexical = BM25Index()
+        self.vectors = VectorIndex()
+        self.lock = threading.Lock()
+        self.loaded = threading.Event()
+        self.dirty = False
+        self.touched = False
+        self.saved_at = time.monotonic()
+        self.save_lock = threading.Lock()
+        self.writer_file = None
+        self.version = 0
+        self.recall_cache = OrderedDict()
+        self.embed_cache = OrderedDict()
+        self.embed_lock = threading.Lock()
+        self.embed_ms = None
+        self.embed_down_until = 0.0
+        self.recall_counts = {"hybrid": 0, "vector": 0, "lexical": 0, "cached": 0}
+        self.consolidation = {"merged": 0, "evicted": 0, "compactions": 0}
         os.makedirs(os.path.dirname(PATHWAYS_FILE), exist_ok=True)
-        self.load()
     def load(self):
+        pathways = []
         if os.path.exists(PATHWAYS_FILE):
             try:
-                with open(PATHWAYS_FILE, "r") as f: self.pathways = json.load(f)
-            except: self.pathways = []
+                with open(PATHWAYS_FILE, "r") as f: pathways = json.load(f)
+            except: pathways = []
+        now = time.time()
+        with self.lock:
+            self.pathways, self.by_text = {}, {}
+            self.lexical, self.vectors = BM25Index(), VectorIndex()
+            for entry in pathways:
+                entry.setdefault("count", 1)
+                entry.setdefault("hits", 0)
+                entry.setdefault("last_used", now)
+                self._index(entry)
+        self.loaded.set()
+    def _index(self, entry):
+        if "id" not in entry:
+            entry["id"] = self.next_id
+        self.next_id = max(self.next_id, entry["id"] + 1)
+        # The vector lives only in the (normalised) matrix; save() writes it back out from there.
+        vector = entry.pop("vec", None)
+        if vector:
+            self.vectors.add(entry["id"], vector)
+        self.pathways[entry["id"]] = entry
+        self.by_text[entry["text"]] = entry["id"]
+        self.lexical.add(entry["id"], entry["text"])
+        self.version += 1
+    def _drop(self, doc_id):
+        entry = self.pathways.pop(doc_id)
+        if self.by_text.get(entry["text"]) == doc_id:
+            del self.by_text[entry["text"]]
+        self.lexical.remove(doc_id)
+        self.vectors.remove(doc_id)
+        self.version += 1
+    def is_writer(self):
+        # Several inference processes load the same store; only the one holding this lock ever writes it back.
+        # The OS drops the lock when that process dies, so another one takes over on its next save.
+        if self.writer_file is None:
+            handle = open(PATHWAYS_FILE + ".lock", "a")
+            try:
+                fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                handle.close()
+                return False
+            self.writer_file = handle
+        return True
     def save(self):
-        with open(PATHWAYS_FILE, "w") as f: json.dump(self.pathways, f)
+        # Only the copy happens under self.lock; serialising thousands of vectors takes seconds and must not stall recall.
+        # save_lock keeps concurrent saves in snapshot order.
+        with self.save_lock:
+            if not self.is_writer():
+                return False
+            with self.lock:
+                rows = []
+                for doc_id, entry in self.pathways.items():
+                    vector = self.vectors.vector(doc_id)
+                    rows.append((dict(entry), None if vector is None else vector.copy()))
+                self.dirty = self.touched = False
+                self.saved_at = time.monotonic()
+            try:
+                out = [dict(entry, vec=vector.tolist() if vector is not None else None) for entry, vector in rows]
+                tmp = PATHWAYS_FILE + ".tmp"
+                with open(tmp, "w") as f: json.dump(out, f)
+                os.replace(tmp, PATHWAYS_FILE)
+            except Exception:
+                with self.lock:
+                    self.dirty = True
+                raise
+        return True
     def embed(self, text):
+        with self.embed_lock:
+            cached = self.embed_cache.get(text)
+            if cached is not None:
+                self.embed_cache.move_to_end(text)
+                return cached
+        started = time.perf_counter()
         try:
-            res = ollama.embeddings(model=EMBED_MODEL, prompt=text)
-            return res['embedding']
-        except: return None
+            with span("embed"):
+                res = ollama.embeddings(model=EMBED_MODEL, prompt=text)
+        except:
+            self.embed_down_until = time.monotonic() + EMBED_RETRY_SEC
+            return None
+        elapsed_ms = (time.perf_counter() - started) * 1000.0
+        self.embed_ms = elapsed_ms if self.embed_ms is None else 0.8 * self.embed_ms + 0.2 * elapsed_ms
+        vector = res['embedding']
+        if EMBED_CACHE_SIZE > 0:
+            with self.embed_lock:
+                self.embed_cache[text] = vector
+                while len(self.embed_cache) > EMBED_CACHE_SIZE:
+                    self.embed_cache.popitem(last=False)
+        return vector
+    def embed_available(self):
+        # Down or averaging over budget -> lexical-only until EMBED_RETRY_SEC passes, then one fresh probe.
+        now = time.monotonic()
+        if now < self.embed_down_until:
+            return False
+        if self.embed_ms is not None and self.embed_ms > EMBED_BUDGET_MS:
+            self.embed_down_until = now + EMBED_RETRY_SEC
+            self.embed_ms = None
+            return False
+        return True
     def remember(self, text):
-        vector = self.embed(text)
-        if vector:
-            self.pathways.append({"text": text, "vec": vector})
+        self.loaded.wait()
+        vector = self.embed(text) if self.embed_available() else None
+        with self.lock:
+            now = time.time()
+            # Exact repeats and near-duplicate embeddings fold into the existing memory instead of growing the store.
+            dup_id = self.by_text.get(text)
+            if dup_id is None and vector:
+                nearest = self.vectors.search(vector, 1)
+                if nearest and nearest[0][1] >= MEMORY_DEDUP_SIM:
+                    dup_id = nearest[0][0]
+            if dup_id is not None:
+                entry = self.pathways[dup_id]
+                entry["count"] += 1
+                entry["last_used"] = now
+                self.consolidation["merged"] += 1
+                self.dirty = True
+                return True
+            # Stored even without a vector: the lexical index still finds it.
+            self._index({"id": self.next_id, "text": text, "vec": vector, "count": 1, "hits": 0, "last_used": now})
+            if len(self.pathways) > MEMORY_CAPACITY:
+                # Evict in batches down to 95% so a full store doesn't rescan on every insert.
+                self._evict(len(self.pathways) - int(MEMORY_CAPACITY * 0.95))
+        self.save()
+        return True
+    def _retention_score(self, entry, now):
+        # Frequency (merges + recall hits) decayed by time since last use.
+        age = max(0.0, now - entry["last_used"])
+        return (entry["count"] + entry["hits"]) * 0.5 ** (age / MEMORY_HALF_LIFE_SEC)
+    def _evict(self, count):
+        if count <= 0:
+            return
+        now = time.time()
+        victims = heapq.nsmallest(count, self.pathways.values(), key=lambda e: self._retention_score(e, now))
+        for entry in victims:
+            self._drop(entry["id"])
+        self.consolidation["evicted"] += len(victims)
+        self.dirty = True
+    def compact(self):
+        with self.lock:
+            self._evict(len(self.pathways) - MEMORY_CAPACITY)
+            if self.vectors.dead:
+                self.vectors.compact()
+            due = self.dirty or (self.touched and time.monotonic() - self.saved_at >= MEMORY_TOUCH_FLUSH_SEC)
+            self.consolidation["compactions"] += 1
+        if due:
             self.save()
-            return True
-        return False
-    def recall(self, query, top_k=3):
-        q_vec = self.embed(query)
-        if not q_vec or not self.pathways: return []
-        results = []
-        for p in self.pathways:
-            dot = sum(a*b for a,b in zip(q_vec, p['vec']))
-            norm1 = math.sqrt(sum(a*a for a in q_vec))
-            norm2 = math.sqrt(sum(b*b for b in p['vec']))
-            sim = dot / (max(1e-9, norm1) * max(1e-9, norm2))
-            results.append((sim, p['text']))
-        results.sort(key=lambda x: x[0], reverse=True)
-        return [r[1] for r in results[:top_k]]
+    def start_compactor(self):
+        def loop():
+            while True:
+                time.sleep(MEMORY_COMPACT_SEC)
+                try:
+                    self.compact()
+                except Exception as e:
+                    logging.warning(f"Memory compaction failed: {e}")
+        threading.Thread(target=loop, name="memory-compactor", daemon=True).start()
+    def recall(self, query, top_k=3, deadline=None):
+        if not self.loaded.is_set(): return []
+        key = (query, top_k)
+        with self.lock:
+            # Any insert/drop bumps self.version, which invalidates every cached result at once.
+            cached = self.recall_cache.get(key)
+            if cached is not None and cached[0] == self.version:
+                self.recall_cache.move_to_end(key)
+                self.recall_counts["cached"] += 1
+                return self._touch(cached[1])
+        q_vec = None
+        # A request that cannot afford a typical embed round-trip before its deadline goes lexical-only.
+        affordable = deadline is None or (deadline - time.time()) * 1000.0 > (self.embed_ms or 0.0)
+        if RECALL_MODE != "lexical" and affordable and self.embed_available():
+            q_vec = self.embed(query)
+        with self.lock:
+            if not self.pathways: return []
+            pool = max(top_k * 4, 20)
+            vector = self.vectors.search(q_vec, pool) if q_vec else []
+            lexical = []
+            if not (vector and RECALL_MODE == "vector"):
+                with span("recall_lexical"):
+                    lexical = self.lexical.search(query, pool)
+            if vector and lexical:
+                ranked, used = reciprocal_rank_fusion([[d for d, _ in vector], [d for d, _ in lexical]], pool), "hybrid"
+            elif vector:
+                ranked, used = vector, "vector"
+            else:
+                ranked, used = lexical, "lexical"
+            if 0 < RECALL_MMR_LAMBDA < 1 and len(ranked) > top_k:
+                with span("recall_mmr"):
+                    candidates = [doc_id for doc_id, _ in ranked]
+                    picks = mmr([score for _, score in ranked], self.vectors.matrix(candidates), top_k, RECALL_MMR_LAMBDA)
+                    ids = [candidates[i] for i in picks]
+            else:
+                ids = [doc_id for doc_id, _ in ranked[:top_k]]
+            self.recall_counts[used] += 1
+            # Lexical fallbacks are not cached, so hybrid results come back once the embedder recovers.
+            if RECALL_CACHE_SIZE > 0 and (used != "lexical" or RECALL_MODE == "lexical"):
+                self.recall_cache[key] = (self.version, ids)
+                self.recall_cache.move_to_end(key)
+                while len(self.recall_cache) > RECALL_CACHE_SIZE:
+                    self.recall_cache.popitem(last=False)
+            return self._touch(ids)
+    def _touch(self, ids):
+        now = time.time()
+        for doc_id in ids:
+            entry = self.pathways[doc_id]
+            entry["hits"] += 1
+            entry["last_used"] = now
+        if ids:
+            self.touched = True
+        return [self.pathways[doc_id]['text'] for doc_id in ids]
+    def stats(self):
+        with self.lock:
+            return {
+                "memories": len(self.pathways),
+                "capacity": MEMORY_CAPACITY,
+                "vectors": len(self.vectors),
+                "tombstones": self.vectors.dead,
+                "writer": self.writer_file is not None,
+                "terms": len(self.lexical.postings),
+                "recall_mode": RECALL_MODE,
+                "embed_ms": round(self.embed_ms, 1) if self.embed_ms is not None else None,
+                "embed_available": time.monotonic() >= self.embed_down_until,
+                "recalls": dict(self.recall_counts),
+                "recall_cache_entries": len(self.recall_cache),
+                "mmr_lambda": RECALL_MMR_LAMBDA,
+                **self.consolidation,
+            }
 
 class WebCortex:
     def __init__(self):
-        self.ddg = DDGS()
+        self.searcher = SearchCache(build_backend(SEARCH_BACKEND, SEARCH_FIXTURES), ttl_sec=SEARCH_CACHE_TTL_SEC)
+        self._fetcher = None
+        self._fetcher_lock = threading.Lock()
+    @property
+    def fetcher(self):
+        # requests is only imported once the first [READ] needs it.
+        with self._fetcher_lock:
+            if self._fetcher is None:
+                from web_fetch import CachedFetcher
+                self._fetcher = CachedFetcher(WEB_CACHE_DIR, ttl_sec=WEB_CACHE_TTL_SEC, max_entries=WEB_CACHE_MAX_ENTRIES)
+            return self._fetcher
+    def stats(self):
+        return {
+            "web_cache": self._fetcher.stats() if self._fetcher else None,
+            "search_cache": self.searcher.stats(),
+        }
     def search(self, query):
         try:
-            results = self.ddg.text(query, max_results=5)
+            results = self.searcher.search(query, max_results=5)
             return "\n".join([f"- {r['title']}: {r['body']} (URL: {r['href']})" for r in results])
         except: return "Search Error."
     def read(self, url):
-        try:
-            res = requests.get(url, timeout=10, headers={"User-Agent": "Mozilla/5.0"})
-            soup = BeautifulSoup(res.text, 'html.parser')
-            for s in soup(['script', 'style']): s.extract()
-            return soup.get_text(separator=' ', strip=True)[:5000]
+        try: return self.fetcher.read_text(url, max_chars=5000)
         except: return "Read Error."
     def http_request(self, method, url, payload=None):
         try:
+            import requests
             forbidden = ["openai", "anthropic", "google", "deepmind", "microsoft", ".edu", "twitter", "x.com"]
             if any(f in url.lower() for f in forbidden):
                 return "HTTP ERROR: Communication restricted."
@@ -145,17 +443,36 @@ class CognitiveCore:
         self.knowledge = KnowledgeCortex()
         self.web = WebCortex()
         self.net = NetworkCortex()
+        self.tools = ToolExecutor(max_workers=TOOL_WORKERS, max_pending=TOOL_QUEUE_MAX)
         self.web_context = ""
         self.last_user_msg = ""
         self.msg_queue = deque()
-        self.outbox = deque(maxlen=500)
+        self.texts = TextInterner()
+        self.codec = Codec(RETENTION_CODEC)
+        self.outbox = BudgetedLog(500, OUTBOX_BUDGET_BYTES, self.texts, self.codec, RETENTION_HOT_ITEMS)
         self.gateway_counter = 0
         self.lock = threading.Lock()
+        self.queue_ready = threading.Condition(self.lock)
+        self.reply_lock = threading.Lock()
+        self.batching = BATCH_WINDOW_MS > 0 and BATCH_MAX > 1
+        self.batch_pool = ThreadPoolExecutor(max_workers=BATCH_MAX, thread_name_prefix="batch") if self.batching else None
+        self.batch_stats = {"batches": 0, "batched_messages": 0, "largest": 0}
+        self.prefetch_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="prefetch") if PREFETCH_ENABLED else None
+        self.prefetch_stats = {"started": 0, "used": 0, "stale": 0, "failed": 0}
+        self.sizer = ContextSizer(OUTPUT_TOKEN_BUDGETS, min_ctx=CTX_MIN, max_ctx=CTX_MAX)
+        self.deadline_stats = {"expired": {}, "cancelled_streams": 0, "useful_ms": 0.0, "wasted_ms": 0.0}
+        self.conversations = ConversationStore(
+            self._summarize_turns,
+            budget_tokens=HISTORY_TOKEN_BUDGET,
+            summary_after_turns=SUMMARY_AFTER_TURNS,
+        )
         self.last_autonomous_run = 0.0
         self.model_failures = 0
-        self.installed_models = self._load_installed_models()
+        self.installed_models = set()
+        self.ready = {"models": False, "memory": False}
+        self.startup_ms = None
         self.crashed_models = set()
-        self.trace = deque(maxlen=1000)
+        self.trace = BudgetedLog(1000, TRACE_BUDGET_BYTES, self.texts, self.codec, RETENTION_HOT_ITEMS)
         self.trace_counter = 0
         self.last_reply_text = ""
         self.last_thought_raw = ""
@@ -164,27 +481,86 @@ class CognitiveCore:
         self.last_model_used = ""
         self.cycle_count = 0
         self.thought_counter = 0
-        self.thoughts = deque(maxlen=500)
+        self.thoughts = BudgetedLog(500, THOUGHTS_BUDGET_BYTES, self.texts, self.codec, RETENTION_HOT_ITEMS)
+        self.inference_thread_id = None
+        self.stopping = threading.Event()
+        self.last_published = 0.0
+        self.cycle_idle = threading.Event()
+        self.cycle_idle.set()
+        self.inflight = {}
+        self.sampler = StackSampler()
+        self.worker_id = f"{ROLE}:{os.getpid()}"
+        self.broker = Broker(BROKER_DB) if BROKER_DB else None
+        if self.broker is not None:
+            self.broker.init_schema()
+            self.prefetch_pool = None
+        if ROLE == "api":
+            # API workers never load models or memory; they are ready as soon as the broker is.
+            self.ready = {"broker": self.broker is not None}
+        self.state_versions = VersionedState(self.get_operator_state)
+        self.emotion_versions = VersionedState(self.get_emotion_state)
 
     def _trace(self, event, detail=None):
+        profile = current_profile()
+        if self.broker is not None:
+            self.broker.append_trace(
+                datetime.utcnow().isoformat() + "Z",
+                event,
+                detail or {},
+                profile.snapshot() if profile is not None else None,
+            )
+            return
         with self.lock:
             self.trace_counter += 1
-            self.trace.append({
-                "id": self.trace_counter,
-                "timestamp": datetime.utcnow().isoformat() + "Z",
-                "event": event,
-                "detail": detail or {}
-            })
+            self.trace.append(TraceRecord(
+                id=self.trace_counter,
+                timestamp=datetime.utcnow().isoformat() + "Z",
+                event=event,
+                detail=detail or {},
+                spans=profile.snapshot() if profile is not None else None,
+            ))
 
     def get_trace(self, after_id=0, limit=100):
+        if self.broker is not None:
+            return self.broker.trace_after(after_id, max(1, min(limit, 500)))
         with self.lock:
-            items = [x for x in self.trace if x["id"] > after_id]
-        return items[:max(1, min(limit, 500))]
+            return self.trace.after(after_id, max(1, min(limit, 500)))
+
+    def _queue_depth(self):
+        if self.broker is not None:
+            return self.broker.queue_depth()
+        with self.lock:
+            return len(self.msg_queue)
+
+    def publish_state(self, force=True):
+        # Inference processes publish their view so any API worker can answer /operator/state and /status.
+        # Idle cycles only refresh it every STATE_PUBLISH_IDLE_SEC, as one write.
+        if self.broker is None or ROLE == "api":
+            return
+        now = time.monotonic()
+        if not force and now - self.last_published < STATE_PUBLISH_IDLE_SEC:
+            return
+        self.last_published = now
+        self.broker.publish_many({"operator_state": self.get_operator_state(), "emotions": self.emotions.get_state()})
 
     def get_operator_state(self):
+        if ROLE == "api" and self.broker is not None:
+            state = self.broker.read("operator_state") or {}
+            return dict(
+                state, queue_depth=self.broker.queue_depth(), outbox_depth=self.broker.count("outbox"),
+                sessions=self.broker.sessions(), role=ROLE,
+            )
+        queue_depth = self._queue_depth()
         with self.lock:
-            queue_depth = len(self.msg_queue)
-            outbox_depth = len(self.outbox)
+            outbox_depth = self.broker.count("outbox") if self.broker is not None else len(self.outbox)
+            memory = {
+                "thoughts": self.thoughts.stats(),
+                "outbox": self.outbox.stats(),
+                "trace": self.trace.stats(),
+                "interned_texts": len(self.texts.table),
+                "interned_bytes": self.texts.bytes,
+                "codec": self.codec.name,
+            }
         state = self.emotions.get_state()
         return {
             "workspace": WORKSPACE,
@@ -200,7 +576,17 @@ class CognitiveCore:
             "crashed_models": sorted(self.crashed_models),
             "installed_models": sorted(self.installed_models),
             "web_context_preview": self.web_context[:500],
+            **self.web.stats(),
+            "tools": self.tools.stats(),
+            "conversations": self.conversations.stats(),
+            "prefetch": dict(self.prefetch_stats, enabled=self.prefetch_pool is not None),
+            "batching": dict(self.batch_stats, enabled=self.batching, window_ms=BATCH_WINDOW_MS, max_size=BATCH_MAX),
+            "context_sizing": self.sizer.stats(),
+            "deadlines": dict(self.deadline_stats, expired=dict(self.deadline_stats["expired"])),
+            "knowledge": self.knowledge.stats(),
+            "memory": memory,
             "cycle_count": self.cycle_count,
+            "role": ROLE,
             "autonomous_enabled": AUTONOMOUS_ENABLED,
             "autonomous_interval_sec": AUTONOMOUS_INTERVAL_SEC,
             "mood": state.get("mood"),
@@ -208,29 +594,53 @@ class CognitiveCore:
         }
 
     def get_emotion_state(self):
+        if ROLE == "api" and self.broker is not None:
+            return self.broker.read("emotions") or {}
         return self.emotions.get_state()
 
     def _record_thought(self, raw_text, public_text, model, mode, sender, in_reply_to):
+        if self.broker is not None:
+            self.broker.append_thought(
+                datetime.utcnow().isoformat() + "Z", raw_text, public_text, model, mode, sender, in_reply_to
+            )
+            self.last_thought_raw = raw_text
+            self.last_thought_public = public_text
+            return
         with self.lock:
             self.thought_counter += 1
-            item = {
-                "id": self.thought_counter,
-                "timestamp": datetime.utcnow().isoformat() + "Z",
-                "raw": raw_text,
-                "public": public_text,
-                "model": model,
-                "mode": mode,
-                "sender": sender,
-                "in_reply_to": in_reply_to,
-            }
-            self.thoughts.append(item)
-        self.last_thought_raw = raw_text
-        self.last_thought_public = public_text
+            item = self.thoughts.append(ThoughtRecord(
+                id=self.thought_counter,
+                timestamp=datetime.utcnow().isoformat() + "Z",
+                raw=raw_text,
+                public=public_text,
+                model=model,
+                mode=mode,
+                sender=sender,
+                in_reply_to=in_reply_to,
+            ))
+        # Point at the interned copies so the "last" fields never hold a second copy of the text.
+        self.last_thought_raw = item.raw
+        self.last_thought_public = item.public
 
     def get_thoughts(self, after_id=0, limit=50):
+        if self.broker is not None:
+            return self.broker.thoughts_after(after_id, max(1, min(limit, 300)))
         with self.lock:
-            items = [x for x in self.thoughts if x["id"] > after_id]
-        return items[:max(1, min(limit, 300))]
+            return self.thoughts.after(after_id, max(1, min(limit, 300)))
+
+    def initialize(self):
+        # Runs off the event loop so /status answers while the memory store and model list load.
+        self.knowledge.load()
+        self.knowledge.start_compactor()
+        self.ready["memory"] = True
+        self.installed_models = self._load_installed_models()
+        self.ready["models"] = True
+        self.startup_ms = round((time.perf_counter() - BOOT_STARTED) * 1000.0, 1)
+        logging.info(f"Node ready in {self.startup_ms} ms.")
+        self._trace("startup_ready", {"startup_ms": self.startup_ms, "memories": len(self.knowledge.pathways), "models": len(self.installed_models)})
+
+    def is_ready(self):
+        return all(self.ready.values())
 
     def _load_installed_models(self):
         try:
@@ -260,29 +670,80 @@ class CognitiveCore:
                 seen.add(model)
                 yield model
 
-    def _chat_with_resilience(self, system_prompt, user_prompt):
+    def _expired(self, deadline, stage):
+        if deadline is None or time.time() < deadline:
+            return False
+        with self.lock:
+            expired = self.deadline_stats["expired"]
+            expired[stage] = expired.get(stage, 0) + 1
+        return True
+
+    def _count_inference(self, key, started):
+        with self.lock:
+            self.deadline_stats[key] += (time.perf_counter() - started) * 1000.0
+
+    def _stream_chat(self, model_name, messages, options, deadline):
+        # Streaming lets a request be abandoned between tokens; closing the stream drops the HTTP connection,
+        # which makes Ollama stop generating. Prompt evaluation before the first token cannot be interrupted.
+        stream = ollama.chat(model=model_name, messages=messages, options=options, stream=True)
+        parts = []
+        final = {}
+        try:
+            for chunk in stream:
+                parts.append(chunk["message"]["content"])
+                if chunk.get("done"):
+                    final = {k: chunk.get(k) for k in ("prompt_eval_count", "eval_count", "eval_duration", "done_reason")}
+                if self._expired(deadline, "model"):
+                    with self.lock:
+                        self.deadline_stats["cancelled_streams"] += 1
+                    raise DeadlineExceeded("model")
+        finally:
+            close = getattr(stream, "close", None)
+            if close is not None:
+                close()
+        return {"message": {"content": "".join(parts)}, **final}
+
+    def _chat_with_resilience(self, system_prompt, user_prompt, deadline=None, mode="default"):
         last_error = None
         model_candidates = list(self._iter_model_candidates())
         if not model_candidates:
             raise RuntimeError("No usable installed chat models available.")
+        messages = [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt},
+        ]
         for model_name in model_candidates:
             for attempt in range(2):
-                options = {"num_ctx": 1024 if attempt == 0 else 512, "temperature": 0.7, "num_predict": 384}
+                if self._expired(deadline, "model"):
+                    raise DeadlineExceeded("model")
+                remaining = None if deadline is None else deadline - time.time()
+                num_ctx, num_predict, estimate, fits = self.sizer.plan(model_name, messages, mode, remaining)
+                if attempt and not fits:
+                    # The memory ceiling learned from the last failure cannot hold this prompt; try the next model.
+                    break
+                options = {"num_ctx": num_ctx, "temperature": 0.7, "num_predict": num_predict}
+                started = time.perf_counter()
                 try:
-                    self._trace("model_attempt", {"model": model_name, "attempt": attempt + 1, "num_ctx": options["num_ctx"]})
-                    response = ollama.chat(
-                        model=model_name,
-                        messages=[
-                            {"role": "system", "content": system_prompt},
-                            {"role": "user", "content": user_prompt},
-                        ],
-                        options=options,
-                    )
+                    self._trace("model_attempt", {
+                        "model": model_name, "attempt": attempt + 1, "num_ctx": num_ctx,
+                        "num_predict": num_predict, "prompt_tokens_est": estimate,
+                    })
+                    with span("model_chat"):
+                        if deadline is None:
+                            response = ollama.chat(model=model_name, messages=messages, options=options)
+                        else:
+                            response = self._stream_chat(model_name, messages, options, deadline)
+                    self._count_inference("useful_ms", started)
+                    self.sizer.observe(model_name, mode, estimate, response, num_predict)
                     self.model_failures = 0
                     self.last_model_used = model_name
                     self._trace("model_success", {"model": model_name, "attempt": attempt + 1})
                     return response["message"]["content"], model_name
+                except DeadlineExceeded:
+                    self._count_inference("wasted_ms", started)
+                    raise
                 except Exception as exc:
+                    self._count_inference("wasted_ms", started)
                     last_error = exc
                     self.last_error = str(exc)
                     logging.error(
@@ -290,31 +751,81 @@ class CognitiveCore:
                         f"ctx={options['num_ctx']}: {exc}"
                     )
                     self._trace("model_error", {"model": model_name, "attempt": attempt + 1, "error": str(exc)})
+                    if is_memory_error(exc):
+                        # Only an allocation failure shrinks the context; other errors retry the same size.
+                        ceiling = self.sizer.memory_error(model_name, num_ctx)
+                        self._trace("model_ctx_ceiling", {"model": model_name, "num_ctx": ceiling})
+                        continue
                     if "runner has unexpectedly stopped" in str(exc).lower():
                         self.crashed_models.add(model_name)
                         logging.error(f"Quarantined unstable model for this runtime: {model_name}")
                         self._trace("model_quarantined", {"model": model_name})
                         break
-                    time.sleep(0.4)
+                    with span("model_backoff"):
+                        time.sleep(0.4 if deadline is None else max(0.0, min(0.4, deadline - time.time())))
         self.model_failures += 1
         raise RuntimeError(f"All model candidates failed after retries: {last_error}")
 
+    def _inbound(self, item):
+        if isinstance(item, dict):
+            msg_id = item.get("id")
+            msg = item.get("text", "")
+            sender = item.get("sender", "AYDEN")
+            mode = item.get("mode", "default")
+            prefetch = item.get("prefetch")
+            deadline = item.get("deadline")
+        else:
+            msg_id = None
+            msg = str(item)
+            sender = "AYDEN"
+            mode = "default"
+            prefetch = None
+            deadline = None
+        self.last_user_msg = msg
+        return {"id": msg_id, "text": msg, "sender": sender, "mode": mode, "prefetch": prefetch, "deadline": deadline}
+
+    def _take(self, item):
+        # Caller holds self.lock. From here until _respond finishes the message is only in inflight,
+        # so a shutdown mid-prefetch or mid-embed still snapshots it.
+        inbound = self._inbound(item)
+        if inbound["id"] is not None:
+            self.inflight[inbound["id"]] = inbound
+        return inbound
+
+    def _collect_batch(self, first):
+        # Holds the first queued message for up to BATCH_WINDOW_MS so a burst can share one round of model calls.
+        batch = [first]
+        if not self.batching or first["id"] is None:
+            return batch
+        deadline = time.monotonic() + BATCH_WINDOW_MS / 1000.0
+        if self.broker is not None:
+            while len(batch) < BATCH_MAX:
+                claimed = self.broker.claim(self.worker_id)
+                if claimed is not None:
+                    batch.append(self._inbound(claimed))
+                elif time.monotonic() >= deadline:
+                    break
+                else:
+                    time.sleep(0.01)
+            return batch
+        with self.queue_ready:
+            while len(batch) < BATCH_MAX:
+                while self.msg_queue and len(batch) < BATCH_MAX:
+                    batch.append(self._take(self.msg_queue.popleft()))
+                remaining = deadline - time.monotonic()
+                if len(batch) >= BATCH_MAX or remaining <= 0:
+                    break
+                self.queue_ready.wait(remaining)
+        return batch
+
     def get_latest_msg(self):
+        if self.broker is not None:
+            # Shared mode: messages only arrive through the broker; scraping the bridge file would double-process.
+            claimed = self.broker.claim(self.worker_id)
+            return self._inbound(claimed) if claimed is not None else None
         with self.lock:
             if self.msg_queue:
-                item = self.msg_queue.popleft()
-                if isinstance(item, dict):
-                    msg_id = item.get("id")
-                    msg = item.get("text", "")
-                    sender = item.get("sender", "AYDEN")
-                    mode = item.get("mode", "default")
-                else:
-                    msg_id = None
-                    msg = str(item)
-                    sender = "AYDEN"
-                    mode = "default"
-                self.last_user_msg = msg
-                return {"id": msg_id, "text": msg, "sender": sender, "mode": mode}
+                return self._take(self.msg_queue.popleft())
         if not os.path.exists(CHAT_FILE): return None
         try:
             with open(CHAT_FILE, "r") as f:
@@ -330,47 +841,136 @@ class CognitiveCore:
         return None
 
     def post_reply(self, reply, in_reply_to=None):
-        with open(CHAT_FILE, "a") as f:
-            f.write(f"\n[JARVIS]: {reply}\n")
+        with span("chat_file_append"):
+            with open(CHAT_FILE, "a") as f:
+                f.write(f"\n[JARVIS]: {reply}\n")
+        if self.broker is not None:
+            self.broker.post("JARVIS", reply, datetime.utcnow().isoformat() + "Z", in_reply_to)
+            self.last_reply_text = reply
+            self._trace("reply_posted", {"preview": reply[:200]})
+            return reply
         with self.lock:
             self.gateway_counter += 1
-            self.outbox.append({
-                "id": self.gateway_counter,
-                "role": "JARVIS",
-                "text": reply,
-                "timestamp": datetime.utcnow().isoformat() + "Z",
-                "in_reply_to": in_reply_to
-            })
-        self.last_reply_text = reply
+            item = self.outbox.append(MessageRecord(
+                id=self.gateway_counter,
+                role="JARVIS",
+                text=reply,
+                timestamp=datetime.utcnow().isoformat() + "Z",
+                in_reply_to=in_reply_to,
+            ))
+        self.last_reply_text = item.text
         self._trace("reply_posted", {"preview": reply[:200]})
         return reply
 
-    def queue_user_message(self, msg, sender="AYDEN", mode="default"):
+    def queue_user_message(self, msg, sender="AYDEN", mode="default", deadline=None):
         if not msg:
             return None
         clean_sender = (sender or "AYDEN").strip().upper()
         clean_mode = (mode or "default").strip().lower()
         with open(CHAT_FILE, "a") as f:
             f.write(f"\n[{clean_sender}]: {msg}\n")
+        if self.broker is not None:
+            message = self.broker.enqueue(msg, clean_sender, clean_mode, datetime.utcnow().isoformat() + "Z", deadline)
+            self.last_user_msg = msg
+            self._trace("message_queued", {"sender": clean_sender, "mode": clean_mode, "preview": msg[:200]})
+            return message
         with self.lock:
             self.gateway_counter += 1
-            message = {
-                "id": self.gateway_counter,
-                "role": clean_sender,
-                "text": msg,
-                "timestamp": datetime.utcnow().isoformat() + "Z",
-                "mode": clean_mode
-            }
-            self.msg_queue.append({"id": message["id"], "text": msg, "sender": clean_sender, "mode": clean_mode})
-            self.last_user_msg = msg
-            self.outbox.append(message)
+            record = self.outbox.append(MessageRecord(
+                id=self.gateway_counter,
+                role=clean_sender,
+                text=msg,
+                timestamp=datetime.utcnow().isoformat() + "Z",
+                mode=clean_mode,
+            ))
+            message = record.to_dict(self.codec)
+            self.msg_queue.append({
+                "id": record.id,
+                "text": record.text,
+                "sender": clean_sender,
+                "mode": clean_mode,
+                "deadline": deadline,
+                "prefetch": self._start_prefetch(record.text),
+            })
+            self.last_user_msg = record.text
+            self.queue_ready.notify()
         self._trace("message_queued", {"sender": clean_sender, "mode": clean_mode, "preview": msg[:200]})
         return message
 
-    def _build_operator_assist_prompt(self, direct_input, memories):
+    def _start_prefetch(self, text):
+        # Embeds and recalls while the message waits in the queue; the cycle picks the result up from the item.
+        if self.prefetch_pool is None or not self.knowledge.loaded.is_set():
+            return None
+        self.prefetch_stats["started"] += 1
+        return self.prefetch_pool.submit(self._prefetch_recall, text)
+
+    def _prefetch_recall(self, text):
+        version = self.knowledge.version
+        return version, self.knowledge.recall(text)
+
+    def _recall_for(self, inbound, query):
+        future = inbound.get("prefetch") if inbound else None
+        deadline = inbound.get("deadline") if inbound else None
+        if future is not None:
+            try:
+                with span("recall_prefetch_wait"):
+                    version, memories = future.result(None if deadline is None else max(0.0, deadline - time.time()))
+                # A store change since the prefetch started may reorder results; recall again (embedding is cached).
+                if version == self.knowledge.version:
+                    self.prefetch_stats["used"] += 1
+                    return memories
+                self.prefetch_stats["stale"] += 1
+            except Exception:
+                self.prefetch_stats["failed"] += 1
+        if self._expired(deadline, "recall"):
+            raise DeadlineExceeded("recall")
+        return self.knowledge.recall(query, deadline=deadline)
+
+    def _summarize_turns(self, prior, turns):
+        transcript = "\n".join(f"{role}: {text}" for role, text in turns)
+        prompt = (
+            f"Previous summary: {prior or 'none'}\n\nNew conversation turns:\n{transcript}\n\n"
+            "Rewrite the summary to cover everything above in under 120 words. "
+            "Keep names, decisions, open requests and concrete facts. Output only the summary."
+        )
+        model_name = self.last_model_used or MODEL_NAME
+        messages = [{"role": "user", "content": prompt}]
+        # Sized like any chat call: a long transcript must not be cut at a fixed 2048, and the learned
+        # memory ceiling and output lengths for this model apply to summaries too.
+        num_ctx, num_predict, estimate, _ = self.sizer.plan(model_name, messages, "summary")
+        with span("summarize"):
+            try:
+                response = ollama.chat(
+                    model=model_name,
+                    messages=messages,
+                    options={"num_ctx": num_ctx, "temperature": 0.2, "num_predict": num_predict},
+                )
+            except Exception as exc:
+                if is_memory_error(exc):
+                    self.sizer.memory_error(model_name, num_ctx)
+                raise
+        self.sizer.observe(model_name, "summary", estimate, response, num_predict)
+        # Reasoning models wrap their scratchpad in <think>; only the answer belongs in the summary.
+        return THINK_BLOCK.sub("", response["message"]["content"]).strip()
+
+    def _turn_text(self, thought):
+        # History keeps what was said, not the scratchpad or tool payloads ([BUILD] code would eat the budget);
+        # each tool call leaves a short marker so later turns still know it happened.
+        text = THINK_BLOCK.sub("", thought)
+        parts, last = [], 0
+        for call in parse_tool_calls(text):
+            parts.append(text[last:call.start])
+            parts.append(f"[{call.name}]")
+            last = call.end
+        parts.append(text[last:])
+        return "".join(parts).strip()
+
+    def _build_operator_assist_prompt(self, direct_input, memories, history=""):
         return f"""
 OPERATOR REQUEST: {direct_input}
 Memories: {memories}
+Conversation so far:
+{history or "None"}
 Context Preview: {self.web_context[:1000]}
 
 You are assisting an AGI engineering project operator.
@@ -400,8 +1000,7 @@ Constraints:
         blocker = self.last_error if self.last_error else "none"
         installed = sorted(self.installed_models) if self.installed_models else ["unknown (ollama tags unavailable)"]
         crashed = sorted(self.crashed_models)
-        with self.lock:
-            queue_depth = len(self.msg_queue)
+        queue_depth = self._queue_depth()
         if blocker != "none":
             step1 = "Stabilize model path by forcing JARVIS_MODEL to a smaller installed model."
             step2 = "Clear failing prompts and verify one operator message round-trip."
@@ -450,36 +1049,245 @@ Constraints:
         return True
 
     def get_gateway_messages(self, after_id=0, limit=50):
+        if self.broker is not None:
+            return self.broker.outbox_after(after_id, max(1, min(limit, 200)))
         with self.lock:
-            items = [m for m in self.outbox if m["id"] > after_id]
-        return items[:max(1, min(limit, 200))]
+            return self.outbox.after(after_id, max(1, min(limit, 200)))
+
+    def profile_inference(self, seconds, interval_ms=10):
+        if not self.sampler.running.acquire(blocking=False):
+            return None
+        try:
+            self.sampler.interval_sec = max(0.001, interval_ms / 1000.0)
+            self._trace("profile_started", {"seconds": seconds, "interval_ms": interval_ms})
+            return self.sampler.sample(lambda: self.inference_thread_id, seconds)
+        finally:
+            self.sampler.running.release()
 
     def process_cycle(self, visual_data):
+        self.inference_thread_id = threading.get_ident()
+        self.cycle_idle.clear()
+        try:
+            with cycle_profile() as profile:
+                worked = self._run_cycle(visual_data)
+            if worked:
+                self._trace("cycle_profile", profile.summary())
+            self.publish_state(force=worked)
+            return worked
+        finally:
+            self.inference_thread_id = None
+            self.cycle_idle.set()
+
+    def shutdown(self, drain_sec=SHUTDOWN_DRAIN_SEC):
+        # Stop starting cycles, give the running one until the deadline, then persist whatever is left.
+        self.stopping.set()
+        drained = self.cycle_idle.wait(drain_sec)
+        self._trace("shutdown", {"drained": drained, "inflight": sorted(self.inflight)})
+        if self.broker is None:
+            self.save_snapshot()
+        return drained
+
+    def save_snapshot(self):
+        with self.lock:
+            # Messages still being answered go back to the front of the queue, ahead of ones never started.
+            pending = list(self.inflight.values()) + [item for item in self.msg_queue if isinstance(item, dict)]
+            payload = {
+                "saved_at": datetime.utcnow().isoformat() + "Z",
+                "counters": {"gateway": self.gateway_counter, "trace": self.trace_counter, "thought": self.thought_counter},
+                "last": {
+                    "user_msg": self.last_user_msg,
+                    "reply_text": self.last_reply_text,
+                    "thought_raw": self.last_thought_raw,
+                    "thought_public": self.last_thought_public,
+                },
+                "queue": [{k: item.get(k) for k in ("id", "text", "sender", "mode", "deadline")} for item in pending],
+                "outbox": self.outbox.after(0, len(self.outbox)),
+                "trace": self.trace.after(0, len(self.trace)),
+                "thoughts": self.thoughts.after(0, len(self.thoughts)),
+            }
+        payload["conversations"] = self.conversations.export()
+        size = write_snapshot(SNAPSHOT_FILE, payload, self.codec)
+        logging.info(f"Runtime snapshot saved: {len(payload['queue'])} queued, {size} bytes.")
+        return size
+
+    def restore_snapshot(self):
+        if self.broker is not None or not os.path.exists(SNAPSHOT_FILE):
+            return False
+        try:
+            payload = read_snapshot(SNAPSHOT_FILE)
+        except Exception as exc:
+            logging.error(f"Ignoring unreadable runtime snapshot: {exc}")
+            return False
+        with self.lock:
+            counters = payload.get("counters", {})
+            self.gateway_counter = counters.get("gateway", 0)
+            self.trace_counter = counters.get("trace", 0)
+            self.thought_counter = counters.get("thought", 0)
+            last = payload.get("last", {})
+            # Restoring last_user_msg also stops get_latest_msg from re-answering the bridge file's last line.
+            self.last_user_msg = last.get("user_msg", "")
+            self.last_reply_text = last.get("reply_text", "")
+            self.last_thought_raw = last.get("thought_raw", "")
+            self.last_thought_public = last.get("thought_public", "")
+            self.outbox.restore(payload.get("outbox", []), MessageRecord)
+            self.trace.restore(payload.get("trace", []), TraceRecord)
+            self.thoughts.restore(payload.get("thoughts", []), ThoughtRecord)
+            self.msg_queue.extend(payload.get("queue", []))
+        self.conversations.restore(payload.get("conversations", {}))
+        # Consumed once: a later crash must not replay an old queue on top of newer work.
+        os.remove(SNAPSHOT_FILE)
+        self._trace("snapshot_restored", {"queued": len(payload.get("queue", [])), "saved_at": payload.get("saved_at")})
+        return True
+
+    def _run_cycle(self, visual_data):
         self.cycle_count += 1
-        current_state = self.emotions.get_state()
-        inbound = self.get_latest_msg()
-        self._trace("cycle_start", {"cycle_count": self.cycle_count, "has_direct_input": bool(inbound)})
+        with span("tool_results"):
+            self._apply_tool_results()
+        with span("emotion_state"):
+            current_state = self.emotions.get_state()
+        with span("fetch_input"):
+            inbound = self.get_latest_msg()
+        # The shared broker trace is capped in rows, so idle polls there would push real events out within minutes.
+        started = {"cycle_count": self.cycle_count, "has_direct_input": bool(inbound)}
+        quiet = self.broker is not None
+        if not quiet:
+            self._trace("cycle_start", started)
         if not inbound and not AUTONOMOUS_ENABLED:
-            self._trace("cycle_skipped", {"reason": "no_direct_input_and_autonomous_disabled"})
-            return
+            if not quiet:
+                self._trace("cycle_skipped", {"reason": "no_direct_input_and_autonomous_disabled"})
+            return False
         if not inbound and AUTONOMOUS_ENABLED:
             now = time.time()
             if (now - self.last_autonomous_run) < AUTONOMOUS_INTERVAL_SEC:
-                self._trace("cycle_skipped", {"reason": "autonomous_throttle"})
-                return
+                if not quiet:
+                    self._trace("cycle_skipped", {"reason": "autonomous_throttle"})
+                return False
             self.last_autonomous_run = now
+        if quiet:
+            self._trace("cycle_start", started)
+        batch = self._collect_batch(inbound) if inbound else [None]
+        if len(batch) == 1:
+            self._respond(batch[0], visual_data, current_state)
+            return True
+        with self.lock:
+            self.batch_stats["batches"] += 1
+            self.batch_stats["batched_messages"] += len(batch)
+            self.batch_stats["largest"] = max(self.batch_stats["largest"], len(batch))
+        self._trace("batch_collected", {"size": len(batch), "ids": [item["id"] for item in batch]})
+        # Recall, prompt build and the model call overlap (Ollama serves them from OLLAMA_NUM_PARALLEL slots);
+        # each reply still routes to its own in_reply_to.
+        profile = current_profile()
+        futures = [
+            self.batch_pool.submit(self._respond_attached, profile, item, visual_data, current_state)
+            for item in batch
+        ]
+        for future in futures:
+            future.result()
+        return True
+
+    def _respond_attached(self, profile, inbound, visual_data, current_state):
+        with attach_profile(profile):
+            self._respond(inbound, visual_data, current_state)
+
+    def _respond(self, inbound, visual_data, current_state):
+        inbound_id = inbound["id"] if inbound else None
+        deadline = inbound.get("deadline") if inbound else None
+        try:
+            if self._expired(deadline, "queue"):
+                raise DeadlineExceeded("queue")
+            self._answer(inbound, visual_data, current_state, deadline)
+        except DeadlineExceeded as exc:
+            # No model output is posted, but the UI keeps polling after /chat gives up, so say what happened.
+            self._trace("deadline_expired", {"stage": exc.stage, "id": inbound_id, "sender": inbound["sender"]})
+            with self.reply_lock:
+                self.post_reply("Timed out before I could answer that. Send it again if you still need it.", in_reply_to=inbound_id)
+        finally:
+            if inbound_id is not None:
+                with self.lock:
+                    self.inflight.pop(inbound_id, None)
+            # Claimed messages stay in the broker until answered, so a crashed worker's claim is requeued, not lost.
+            if self.broker is not None and inbound_id is not None:
+                self.broker.complete(inbound_id)
+
+    def _answer(self, inbound, visual_data, current_state, deadline):
         direct_input = inbound["text"] if inbound else None
         inbound_id = inbound["id"] if inbound else None
         input_sender = inbound["sender"] if inbound else "SYSTEM"
         input_mode = inbound["mode"] if inbound else "default"
-        
+
         query = direct_input if direct_input else "Sovereign AGI Strategy"
-        memories = self.knowledge.recall(query)
+        with span("recall"):
+            memories = self._recall_for(inbound, query)
+        
+        operator_mode = input_mode == "operator_assist" or input_sender == "CODEX"
+        with span("prompt_build"):
+            history = self.conversations.render(input_sender) if inbound else ""
+            prompt = (
+                self._build_operator_assist_prompt(direct_input, memories, history)
+                if operator_mode
+                else self._build_default_prompt(visual_data, direct_input, memories, history)
+            )
+            system = (
+                "You are JARVIS, a practical engineering copilot. Be direct, grounded, and specific."
+                if operator_mode
+                else self.soul.get_system_prompt(current_state['mood'])
+            )
         
-        default_prompt = f"""
+        try:
+            thought, used_model = self._chat_with_resilience(
+                system, prompt, deadline, "operator_assist" if operator_mode else "default"
+            )
+            thought = (thought or "").strip()
+            raw_thought = thought
+            if not thought:
+                thought = "Acknowledged. I am online and ready for your next command."
+            if operator_mode and not self._is_operator_reply_usable(thought):
+                thought = self._operator_assist_fallback(direct_input or "")
+            # Batched replies commit one at a time: tone, bridge-file append and inline tool writes stay ordered.
+            with self.reply_lock:
+                with span("inject_tone"):
+                    public_thought = self.emotions.inject_tone(thought)
+                with span("record_thought"):
+                    self._record_thought(
+                        raw_text=raw_thought,
+                        public_text=public_thought,
+                        model=used_model,
+                        mode=input_mode,
+                        sender=input_sender,
+                        in_reply_to=inbound_id,
+                    )
+                with span("post_reply"):
+                    self.post_reply(public_thought, in_reply_to=inbound_id)
+                if inbound:
+                    self.conversations.add(input_sender, input_sender, direct_input)
+                    self.conversations.add(input_sender, "JARVIS", self._turn_text(thought))
+                logging.info(f"Thought processed with model={used_model}.")
+                self._trace("thought_processed", {"model": used_model, "mode": input_mode, "sender": input_sender, "chars": len(thought)})
+
+                if not self._expired(deadline, "tools"):
+                    with span("tools"):
+                        self._run_tools(thought)
+
+        except DeadlineExceeded:
+            raise
+        except Exception as e:
+            self.last_error = str(e)
+            logging.error(f"Cycle Error: {e}")
+            self._trace("cycle_error", {"error": str(e)})
+            if direct_input:
+                with self.reply_lock:
+                    self.post_reply(
+                        "Core model process is unstable right now. I queued your request and will retry on the next cycle.",
+                        in_reply_to=inbound_id
+                    )
+
+    def _build_default_prompt(self, visual_data, direct_input, memories, history=""):
+        return f"""
 Visual: {visual_data[:200]}
 Context: {self.web_context[:1000]}
 Memories: {memories}
+Conversation so far:
+{history or "None"}
 DIRECT MESSAGE FROM USER: {direct_input if direct_input else "None"}
 
 STATUS: JARVIS-SOVEREIGN-ALPHA (NODE 8000)
@@ -508,102 +1316,100 @@ MISSION:
 CRITICAL: 
 NO VAPORWARE. NO SIMULATION. PUT CODE INSIDE THE [BUILD] TAG.
 """
-        operator_mode = input_mode == "operator_assist" or input_sender == "CODEX"
-        prompt = self._build_operator_assist_prompt(direct_input, memories) if operator_mode else default_prompt
-        system = (
-            "You are JARVIS, a practical engineering copilot. Be direct, grounded, and specific."
-            if operator_mode
-            else self.soul.get_system_prompt(current_state['mood'])
-        )
-        
-        try:
-            thought, used_model = self._chat_with_resilience(system, prompt)
-            thought = (thought or "").strip()
-            raw_thought = thought
-            if not thought:
-                thought = "Acknowledged. I am online and ready for your next command."
-            if operator_mode and not self._is_operator_reply_usable(thought):
-                thought = self._operator_assist_fallback(direct_input or "")
-            public_thought = self.emotions.inject_tone(thought)
-            self._record_thought(
-                raw_text=raw_thought,
-                public_text=public_thought,
-                model=used_model,
-                mode=input_mode,
-                sender=input_sender,
-                in_reply_to=inbound_id,
-            )
-            self.post_reply(public_thought, in_reply_to=inbound_id)
-            logging.info(f"Thought processed with model={used_model}.")
-            self._trace("thought_processed", {"model": used_model, "mode": input_mode, "sender": input_sender, "chars": len(thought)})
-
-            # TOOL PARSING
-            if "SCAN_NETWORK" in thought:
-                self.web_context = self.net.scan_local()
-                self._trace("tool_scan_network", {"ok": True})
-
-            search_match = re.search(r'\[SEARCH:\s*"(.*?)"\]', thought)
-            if search_match:
-                self.web_context = self.web.search(search_match.group(1))
-                self._trace("tool_search", {"query": search_match.group(1)[:200]})
-            
-            read_match = re.search(r'\[READ:\s*"(.*?)"\]', thought)
-            if read_match:
-                self.web_context = self.web.read(read_match.group(1))
-                self._trace("tool_read", {"url": read_match.group(1)[:200]})
-
-            http_match = re.search(r'\[HTTP:\s*"(.*?)",\s*"(.*?)",\s*"(.*?)"\]', thought)
-            if http_match:
-                self.web_context = self.web.http_request(http_match.group(1), http_match.group(2), http_match.group(3))
-                self._trace("tool_http", {"method": http_match.group(1), "url": http_match.group(2)[:200]})
-
-            build_match = re.search(r'\[BUILD:\s*["“](.*?)["”],\s*["“](.*?)["”]\]', thought, re.DOTALL)
-            if build_match:
-                fname, content = build_match.group(1), build_match.group(2)
+
+    def _submit_tool(self, tool, fn, *args, detail=None):
+        job_id = self.tools.submit(tool, fn, *args, detail=detail)
+        if job_id is None:
+            self._trace("tool_rejected", {"tool": tool, **(detail or {})})
+        else:
+            self._trace(f"tool_{tool}", {"job_id": job_id, **(detail or {})})
+
+    def _apply_tool_results(self):
+        done, expired = self.tools.poll()
+        for job in expired:
+            self._trace("tool_timeout", {"job_id": job["id"], "tool": job["tool"], **job["detail"]})
+        for result in done:
+            detail = {"job_id": result["id"], "ms": result["ms"], **result["detail"]}
+            if result["error"]:
+                self._trace("tool_error", {"tool": result["tool"], "error": result["error"], **detail})
+                continue
+            value = result["value"]
+            if isinstance(value, tuple):
+                value, extra = value
+                detail.update(extra)
+            self.web_context = value
+            self._trace(f"tool_{result['tool']}_done", detail)
+
+    def _execute_experiment(self, fpath):
+        res = subprocess.run([sys.executable, fpath], capture_output=True, text=True, timeout=10)
+        return f"EXECUTION RESULT:\n{res.stdout}\n{res.stderr}", {"returncode": res.returncode}
+
+    def _run_tools(self, thought):
+        # TOOL PARSING
+        # Network and subprocess tools run on the tool pool; results land in web_context on a later cycle.
+        # File writes stay inline so a [BUILD] is on disk before a following [EXECUTE] is dispatched.
+        with span("tool_parse"):
+            calls = parse_tool_calls(thought, limit=MAX_TOOL_CALLS)
+        for call in calls:
+            if call.name == "SCAN_NETWORK":
+                self._submit_tool("scan_network", self.net.scan_local)
+
+            elif call.name == "SEARCH":
+                self._submit_tool("search", self.web.search, call.args[0], detail={"query": call.args[0][:200]})
+
+            elif call.name == "READ":
+                self._submit_tool("read", self.web.read, call.args[0], detail={"url": call.args[0][:200]})
+
+            elif call.name == "HTTP":
+                method, url, payload = call.args
+                self._submit_tool("http", self.web.http_request, method, url, payload, detail={"method": method, "url": url[:200]})
+
+            elif call.name == "BUILD":
+                fname, content = call.args
                 fpath = os.path.join(EXP_DIR, fname)
                 os.makedirs(EXP_DIR, exist_ok=True)
-                with open(fpath, "w") as f: f.write(content)
+                with span("tool_build"):
+                    with open(fpath, "w") as f: f.write(content)
                 self.web_context = f"SUCCESS: File '{fname}' built at {fpath}."
                 self._trace("tool_build", {"file": fname})
 
-            exec_match = re.search(r'\[EXECUTE:\s*"(.*?)"\]', thought)
-            if exec_match:
-                fname = exec_match.group(1)
+            elif call.name == "EXECUTE":
+                fname = call.args[0]
                 fpath = os.path.join(EXP_DIR, fname)
-                res = subprocess.run([sys.executable, fpath], capture_output=True, text=True, timeout=10)
-                self.web_context = f"EXECUTION RESULT:\n{res.stdout}\n{res.stderr}"
-                self._trace("tool_execute", {"file": fname, "returncode": res.returncode})
-
-            vault_match = re.search(r'\[UPLOAD_TO_VAULT:\s*"(.*?)"\]', thought, re.DOTALL)
-            if vault_match:
-                content = vault_match.group(1)
-                with open(VAULT_FILE, "a") as f:
-                    f.write(f"\n--- DATA REPORT ---\n{content}\n")
+                self._submit_tool("execute", self._execute_experiment, fpath, detail={"file": fname})
+
+            elif call.name == "UPLOAD_TO_VAULT":
+                content = call.args[0]
+                with span("tool_vault"):
+                    with open(VAULT_FILE, "a") as f:
+                        f.write(f"\n--- DATA REPORT ---\n{content}\n")
                 self.web_context = "REPORT STORED IN DATA_VAULT.MD"
                 self._trace("tool_vault", {"chars": len(content)})
 
-        except Exception as e:
-            self.last_error = str(e)
-            logging.error(f"Cycle Error: {e}")
-            self._trace("cycle_error", {"error": str(e)})
-            if direct_input:
-                self.post_reply(
-                    "Core model process is unstable right now. I queued your request and will retry on the next cycle.",
-                    in_reply_to=inbound_id
-                )
-
 # --- SERVER SETUP ---
 brain = None
 
-@app.on_event("startup")
-async def startup_event():
-    global brain
-    logging.info(f"INITIALIZING SOVEREIGN NODE AT: {WORKSPACE}")
+@app.on_event("shutdown")
+async def shutdown_event():
+    if brain and ROLE != "api":
+        await asyncio.to_thread(brain.shutdown)
+
+def prepare_workspace():
     os.makedirs(WORKSPACE, exist_ok=True)
     if not os.path.exists(CHAT_FILE):
         with open(CHAT_FILE, "w") as f:
             f.write("# Sovereign-Alpha Bridge\n")
+
+@app.on_event("startup")
+async def startup_event():
+    global brain
+    logging.info(f"INITIALIZING SOVEREIGN NODE AT: {WORKSPACE} (role={ROLE})")
+    prepare_workspace()
     brain = CognitiveCore()
+    if ROLE == "api":
+        return
+    brain.restore_snapshot()
+    asyncio.create_task(asyncio.to_thread(brain.initialize))
     asyncio.create_task(life_cycle())
 
 HTML_UI = """
@@ -686,9 +1492,13 @@ def ui():
 
 @app.get("/status")
 def get_status():
-    state = brain.emotions.get_state() if brain else {}
+    state = brain.get_emotion_state() if brain else {}
     return {
         "status": "ONLINE", 
+        "ready": brain.is_ready() if brain else False,
+        "readiness": dict(brain.ready) if brain else {},
+        "startup_ms": brain.startup_ms if brain else None,
+        "role": ROLE,
         "identity": "JARVIS-Sovereign-Alpha", 
         "tier": 5, 
         "port": 8000,
@@ -701,13 +1511,32 @@ def _require_operator_key(x_operator_key):
     if OPERATOR_KEY and x_operator_key != OPERATOR_KEY:
         raise HTTPException(status_code=401, detail="Invalid operator key")
 
+def _timeout_arg(item, default, ceiling):
+    # An explicit null means "use the endpoint default", which for /gateway/send is no deadline at all.
+    value = item.get("timeout_sec")
+    if value is None:
+        value = default
+    if value is None:
+        return None
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=400, detail="timeout_sec must be a number")
+    if value != value:
+        raise HTTPException(status_code=400, detail="timeout_sec must be a number")
+    return max(1.0, min(value, ceiling))
+
+def _request_deadline(wait_for_reply, timeout_sec):
+    # Only a caller that waits has a deadline; fire-and-forget messages are polled for later and never expire.
+    return time.time() + timeout_sec if wait_for_reply else None
+
 @app.post("/chat")
 async def chat_endpoint(item: dict = Body(...)):
     msg = item.get("message")
     wait_for_reply = item.get("wait_for_reply", True)
-    timeout_sec = max(1.0, min(float(item.get("timeout_sec", 25)), 60.0))
+    timeout_sec = _timeout_arg(item, 25, 60.0)
     if brain:
-        queued = brain.queue_user_message(msg, sender="AYDEN", mode="default")
+        queued = brain.queue_user_message(msg, sender="AYDEN", mode="default", deadline=_request_deadline(wait_for_reply, timeout_sec))
         if queued:
             if wait_for_reply:
                 deadline = time.time() + timeout_sec
@@ -733,7 +1562,9 @@ async def gateway_send(item: dict = Body(...)):
     mode = item.get("mode", "default")
     if not brain:
         return {"ok": False, "status": "Brain Offline"}
-    queued = brain.queue_user_message(msg, sender=sender, mode=mode)
+    timeout_sec = _timeout_arg(item, None, 90.0)
+    deadline = time.time() + timeout_sec if timeout_sec else None
+    queued = brain.queue_user_message(msg, sender=sender, mode=mode, deadline=deadline)
     if not queued:
         return {"ok": False, "status": "Ignored Empty Message"}
     return {"ok": True, "queued": queued}
@@ -747,8 +1578,8 @@ async def operator_message(item: dict = Body(...), x_operator_key: str = Header(
     sender = item.get("sender", "CODEX")
     mode = item.get("mode", "operator_assist")
     wait_for_reply = item.get("wait_for_reply", True)
-    timeout_sec = max(1.0, min(float(item.get("timeout_sec", 25)), 90.0))
-    queued = brain.queue_user_message(msg, sender=sender, mode=mode)
+    timeout_sec = _timeout_arg(item, 25, 90.0)
+    queued = brain.queue_user_message(msg, sender=sender, mode=mode, deadline=_request_deadline(wait_for_reply, timeout_sec))
     if not queued:
         return {"ok": False, "status": "Ignored Empty Message"}
     if wait_for_reply:
@@ -762,31 +1593,42 @@ async def operator_message(item: dict = Body(...), x_operator_key: str = Header(
     return {"ok": True, "queued": queued}
 
 @app.get("/gateway/poll")
-def gateway_poll(after_id: int = 0, limit: int = 50):
+def gateway_poll(request: Request, after_id: int = 0, limit: int = 50):
     if not brain:
         return {"ok": False, "status": "Brain Offline", "messages": []}
-    return {"ok": True, "messages": brain.get_gateway_messages(after_id=after_id, limit=limit)}
+    return json_response(request, {"ok": True, "messages": brain.get_gateway_messages(after_id=after_id, limit=limit)})
 
 @app.get("/operator/state")
-def operator_state(x_operator_key: str = Header(default="")):
+def operator_state(
+    request: Request,
+    since: str = "",
+    x_operator_key: str = Header(default=""),
+    if_none_match: str = Header(default=""),
+):
     _require_operator_key(x_operator_key)
     if not brain:
         return {"ok": False, "status": "Brain Offline"}
-    return {"ok": True, "state": brain.get_operator_state()}
+    # If-None-Match only decides 304 vs full body: caches treat any 200 as the whole resource, so deltas need `since`.
+    cached = if_none_match.strip().strip('"')
+    version, state, delta = brain.state_versions.since(since)
+    headers = {"ETag": f'"{version}"'}
+    if cached and cached == version:
+        return Response(status_code=304, headers=headers)
+    return json_response(request, {"ok": True, "version": version, "delta": delta, "state": state}, headers=headers)
 
 @app.get("/operator/trace")
-def operator_trace(after_id: int = 0, limit: int = 100, x_operator_key: str = Header(default="")):
+def operator_trace(request: Request, after_id: int = 0, limit: int = 100, x_operator_key: str = Header(default="")):
     _require_operator_key(x_operator_key)
     if not brain:
         return {"ok": False, "status": "Brain Offline", "trace": []}
-    return {"ok": True, "trace": brain.get_trace(after_id=after_id, limit=limit)}
+    return json_response(request, {"ok": True, "trace": brain.get_trace(after_id=after_id, limit=limit)})
 
 @app.get("/operator/thoughts")
-def operator_thoughts(after_id: int = 0, limit: int = 50, x_operator_key: str = Header(default="")):
+def operator_thoughts(request: Request, after_id: int = 0, limit: int = 50, x_operator_key: str = Header(default="")):
     _require_operator_key(x_operator_key)
     if not brain:
         return {"ok": False, "status": "Brain Offline", "thoughts": []}
-    return {"ok": True, "thoughts": brain.get_thoughts(after_id=after_id, limit=limit)}
+    return json_response(request, {"ok": True, "thoughts": brain.get_thoughts(after_id=after_id, limit=limit)})
 
 @app.get("/operator/emotions")
 def operator_emotions(x_operator_key: str = Header(default="")):
@@ -797,22 +1639,64 @@ def operator_emotions(x_operator_key: str = Header(default="")):
 
 @app.get("/operator/live")
 def operator_live(
+    request: Request,
     after_trace_id: int = 0,
     after_thought_id: int = 0,
     after_message_id: int = 0,
+    fields: str = "",
+    thought_chars: int = 0,
+    state_since: str = "",
+    emotions_since: str = "",
     x_operator_key: str = Header(default=""),
 ):
     _require_operator_key(x_operator_key)
     if not brain:
         return {"ok": False, "status": "Brain Offline"}
-    return {
-        "ok": True,
-        "state": brain.get_operator_state(),
-        "emotions": brain.get_emotion_state(),
-        "trace": brain.get_trace(after_id=after_trace_id, limit=50),
-        "thoughts": brain.get_thoughts(after_id=after_thought_id, limit=20),
-        "messages": brain.get_gateway_messages(after_id=after_message_id, limit=50),
+    # Sections left out of `fields` are never built; thought_chars clips raw/public model text to a preview.
+    # state/emotions carry a version; passing it back as *_since returns only the fields changed since then.
+    spec = parse_fields(fields)
+    versioned = {
+        "state": (brain.state_versions, state_since),
+        "emotions": (brain.emotion_versions, emotions_since),
+    }
+    sections = {
+        "trace": lambda: brain.get_trace(after_id=after_trace_id, limit=50),
+        "thoughts": lambda: brain.get_thoughts(after_id=after_thought_id, limit=20),
+        "messages": lambda: brain.get_gateway_messages(after_id=after_message_id, limit=50),
     }
+    payload = {"ok": True}
+    for name, (tracker, token) in versioned.items():
+        if wants(spec, name):
+            version, value, _ = tracker.since(token)
+            payload[f"{name}_version"] = version
+            payload[name] = project(value, spec.get(name) if spec else None)
+    for name, build in sections.items():
+        if wants(spec, name):
+            payload[name] = project(build(), spec.get(name) if spec else None)
+    if thought_chars > 0:
+        for item in payload.get("thoughts", []):
+            for key in ("raw", "public"):
+                if isinstance(item.get(key), str):
+                    item[key] = item[key][:thought_chars]
+    return json_response(request, payload)
+
+@app.get("/operator/profile")
+async def operator_profile(seconds: float = 10.0, interval_ms: int = 10, x_operator_key: str = Header(default="")):
+    _require_operator_key(x_operator_key)
+    if not brain:
+        raise HTTPException(status_code=503, detail="Brain Offline")
+    if ROLE == "api":
+        # Cycles run in the inference processes; sampling this one would only show the HTTP worker.
+        raise HTTPException(status_code=501, detail="Profiling runs on the inference process; this API worker has no cycle to sample")
+    seconds = max(1.0, min(seconds, 120.0))
+    interval_ms = max(1, min(interval_ms, 1000))
+    collapsed = await asyncio.to_thread(brain.profile_inference, seconds, interval_ms)
+    if collapsed is None:
+        raise HTTPException(status_code=409, detail="A profile is already running")
+    return PlainTextResponse(
+        collapsed,
+        headers={"Content-Disposition": 'attachment; filename="jarvis-inference.collapsed"'},
+    )
 
 @app.get("/gateway/history")
 def gateway_history(limit: int = 100):
@@ -830,9 +1714,54 @@ def gateway_history(limit: int = 100):
 
 async def life_cycle():
     while True:
-        if brain:
+        if brain and brain.is_ready() and not brain.stopping.is_set():
             await asyncio.to_thread(brain.process_cycle, "Vision Disabled")
         await asyncio.sleep(1)
 
+def run_inference_worker():
+    # Dedicated inference process: no HTTP, just the cycle loop against the shared broker.
+    global brain
+    logging.info(f"INFERENCE WORKER {os.getpid()} AT: {WORKSPACE} (broker={BROKER_DB})")
+    prepare_workspace()
+    brain = CognitiveCore()
+    # SIGTERM from the supervisor ends the loop between cycles, so a claimed message is answered first.
+    signal.signal(signal.SIGTERM, lambda *_: brain.stopping.set())
+    brain.initialize()
+    while not brain.stopping.is_set():
+        if not brain.process_cycle("Vision Disabled"):
+            time.sleep(0.25)
+
 if __name__ == "__main__":
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    import argparse
+    import uvicorn
+    parser = argparse.ArgumentParser(description="Jarvis Sovereign Node")
+    parser.add_argument("--role", choices=["all", "api", "inference"], default=ROLE)
+    parser.add_argument("--api-workers", type=int, default=1)
+    parser.add_argument("--inference-workers", type=int, default=1)
+    args = parser.parse_args()
+    if args.role == "all" and args.api_workers <= 1:
+        uvicorn.run(app, host="0.0.0.0", port=8000)
+    else:
+        # Shared mode: every process (uvicorn workers re-import this module) reads the role and broker from env.
+        os.environ["JARVIS_BROKER_DB"] = BROKER_DB or f"{WORKSPACE}/broker.db"
+        ROLE, BROKER_DB = args.role, os.environ["JARVIS_BROKER_DB"]
+        if args.role == "inference":
+            os.environ["JARVIS_ROLE"] = "inference"
+            run_inference_worker()
+        else:
+            os.environ["JARVIS_ROLE"] = "api"
+            workers = [
+                subprocess.Popen([sys.executable, os.path.abspath(__file__), "--role", "inference"])
+                for _ in range(max(0, args.inference_workers))
+            ]
+            try:
+                uvicorn.run(
+                    "boot:app",
+                    host="0.0.0.0",
+                    port=8000,
+                    workers=max(1, args.api_workers),
+                    app_dir=os.path.dirname(os.path.abspath(__file__)),
+                )
+            finally:
+                for worker in workers:
+                    worker.terminate()
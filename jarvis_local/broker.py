@@ -0,0 +1,240 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+
+# --- SHARED STATE BROKER (SQLITE WAL, MULTI-PROCESS) ---
+# Lets several uvicorn workers and dedicated inference processes on one box share the message queue, outbox,
+# trace and thought streams. Ids come from SQLite, so they stay monotonic across every process.
+# Conversation history lives in the process that answered, so each sender sticks to one worker (sessions table)
+# until that worker stops polling for a claim timeout.
+SCHEMA_SQL = """
+CREATE TABLE IF NOT EXISTS outbox (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    role TEXT NOT NULL,
+    text TEXT NOT NULL,
+    timestamp TEXT NOT NULL,
+    mode TEXT,
+    in_reply_to INTEGER
+);
+CREATE TABLE IF NOT EXISTS queue (
+    id INTEGER PRIMARY KEY,
+    text TEXT NOT NULL,
+    sender TEXT NOT NULL,
+    mode TEXT NOT NULL,
+    deadline REAL,
+    claimed_by TEXT,
+    claimed_at REAL
+);
+CREATE INDEX IF NOT EXISTS idx_queue_claimed ON queue (claimed_by, id);
+CREATE TABLE IF NOT EXISTS sessions (
+    sender TEXT PRIMARY KEY,
+    worker_id TEXT NOT NULL,
+    seen_at REAL NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS trace (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    timestamp TEXT NOT NULL,
+    event TEXT NOT NULL,
+    detail_json TEXT NOT NULL,
+    spans_json TEXT
+);
+CREATE TABLE IF NOT EXISTS thoughts (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    timestamp TEXT NOT NULL,
+    raw TEXT,
+    public TEXT,
+    model TEXT,
+    mode TEXT,
+    sender TEXT,
+    in_reply_to INTEGER
+);
+CREATE TABLE IF NOT EXISTS kv (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    updated_at REAL NOT NULL
+) WITHOUT ROWID;
+"""
+
+INSERT_OUTBOX_SQL = "INSERT INTO outbox (role, text, timestamp, mode, in_reply_to) VALUES (?, ?, ?, ?, ?)"
+INSERT_QUEUE_SQL = "INSERT INTO queue (id, text, sender, mode, deadline) VALUES (?, ?, ?, ?, ?)"
+# Claim is one UPDATE, so two inference processes can never take the same message. A worker only takes
+# senders that are unassigned, already its own, or held by a worker that has stopped polling.
+CLAIM_SQL = """
+UPDATE queue SET claimed_by = ?, claimed_at = ?
+WHERE id = (
+    SELECT q.id FROM queue q LEFT JOIN sessions s ON s.sender = q.sender
+    WHERE q.claimed_by IS NULL AND (s.worker_id IS NULL OR s.worker_id = ? OR s.seen_at < ?)
+    ORDER BY q.id LIMIT 1
+)
+RETURNING id, text, sender, mode, deadline
+"""
+REQUEUE_SQL = "UPDATE queue SET claimed_by = NULL, claimed_at = NULL WHERE claimed_by IS NOT NULL AND claimed_at < ?"
+STICK_SQL = "INSERT OR REPLACE INTO sessions (sender, worker_id, seen_at) VALUES (?, ?, ?)"
+# Every poll keeps the worker's sessions alive, however long its senders stay quiet.
+SESSION_HEARTBEAT_SQL = "UPDATE sessions SET seen_at = ? WHERE worker_id = ?"
+SESSION_EXPIRE_SQL = "DELETE FROM sessions WHERE seen_at < ?"
+COMPLETE_SQL = "DELETE FROM queue WHERE id = ?"
+QUEUE_DEPTH_SQL = "SELECT COUNT(*) FROM queue WHERE claimed_by IS NULL"
+INSERT_TRACE_SQL = "INSERT INTO trace (timestamp, event, detail_json, spans_json) VALUES (?, ?, ?, ?)"
+INSERT_THOUGHT_SQL = """
+INSERT INTO thoughts (timestamp, raw, public, model, mode, sender, in_reply_to) VALUES (?, ?, ?, ?, ?, ?, ?)
+"""
+PUBLISH_SQL = "INSERT OR REPLACE INTO kv (key, value, updated_at) VALUES (?, ?, ?)"
+READ_SQL = "SELECT value, updated_at FROM kv WHERE key = ?"
+ROW_LIMITS = {"outbox": 500, "trace": 1000, "thoughts": 500}
+TRIM_EVERY = 64
+
+PRAGMAS = (
+    "PRAGMA journal_mode = WAL",
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA busy_timeout = 5000",
+)
+
+
+class Broker:
+    def __init__(self, db_path, claim_timeout_sec=300.0):
+        self.db_path = db_path
+        self.claim_timeout_sec = claim_timeout_sec
+        self._local = threading.local()
+        self._writes = 0
+        self._writes_lock = threading.Lock()
+        self._last_requeue = 0.0
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+            conn = sqlite3.connect(self.db_path, timeout=5.0, cached_statements=64, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            for pragma in PRAGMAS:
+                conn.execute(pragma)
+            self._local.conn = conn
+        return conn
+
+    def init_schema(self):
+        conn = self._conn()
+        with conn:
+            conn.executescript(SCHEMA_SQL)
+            columns = {row["name"] for row in conn.execute("PRAGMA table_info(queue)")}
+            if "deadline" not in columns:
+                # Broker files created before per-message deadlines existed.
+                conn.execute("ALTER TABLE queue ADD COLUMN deadline REAL")
+
+    def _wrote(self, conn):
+        # Row caps mirror the in-process deques; trimming is amortised over TRIM_EVERY writes per process.
+        with self._writes_lock:
+            self._writes += 1
+            due = self._writes % TRIM_EVERY == 0
+        if due:
+            with conn:
+                for table, limit in ROW_LIMITS.items():
+                    conn.execute(f"DELETE FROM {table} WHERE id <= (SELECT MAX(id) FROM {table}) - ?", (limit,))
+
+    # --- queue ---
+    def enqueue(self, text, sender, mode, timestamp, deadline=None):
+        conn = self._conn()
+        with conn:
+            cur = conn.execute(INSERT_OUTBOX_SQL, (sender, text, timestamp, mode, None))
+            msg_id = cur.lastrowid
+            conn.execute(INSERT_QUEUE_SQL, (msg_id, text, sender, mode, deadline))
+        self._wrote(conn)
+        return {"id": msg_id, "role": sender, "text": text, "timestamp": timestamp, "mode": mode, "in_reply_to": None}
+
+    def claim(self, worker_id):
+        conn = self._conn()
+        now = time.time()
+        with conn:
+            conn.execute(SESSION_HEARTBEAT_SQL, (now, worker_id))
+            if now - self._last_requeue > self.claim_timeout_sec / 4:
+                # Messages held by a worker that died mid-inference go back to the queue, and its senders free up.
+                self._last_requeue = now
+                conn.execute(REQUEUE_SQL, (now - self.claim_timeout_sec,))
+                conn.execute(SESSION_EXPIRE_SQL, (now - self.claim_timeout_sec,))
+            row = conn.execute(CLAIM_SQL, (worker_id, now, worker_id, now - self.claim_timeout_sec)).fetchone()
+            if row:
+                conn.execute(STICK_SQL, (row["sender"], worker_id, now))
+        return dict(row) if row else None
+
+    def sessions(self):
+        rows = self._conn().execute("SELECT worker_id, COUNT(*) AS n FROM sessions GROUP BY worker_id").fetchall()
+        return {row["worker_id"]: row["n"] for row in rows}
+
+    def complete(self, msg_id):
+        conn = self._conn()
+        with conn:
+            conn.execute(COMPLETE_SQL, (msg_id,))
+
+    def queue_depth(self):
+        return self._conn().execute(QUEUE_DEPTH_SQL).fetchone()[0]
+
+    # --- streams ---
+    def post(self, role, text, timestamp, in_reply_to=None):
+        conn = self._conn()
+        with conn:
+            msg_id = conn.execute(INSERT_OUTBOX_SQL, (role, text, timestamp, None, in_reply_to)).lastrowid
+        self._wrote(conn)
+        return msg_id
+
+    def append_trace(self, timestamp, event, detail, spans=None):
+        conn = self._conn()
+        with conn:
+            conn.execute(INSERT_TRACE_SQL, (
+                timestamp, event, json.dumps(detail, default=str), json.dumps(spans) if spans is not None else None
+            ))
+        self._wrote(conn)
+
+    def append_thought(self, timestamp, raw, public, model, mode, sender, in_reply_to):
+        conn = self._conn()
+        with conn:
+            conn.execute(INSERT_THOUGHT_SQL, (timestamp, raw, public, model, mode, sender, in_reply_to))
+        self._wrote(conn)
+
+    def outbox_after(self, after_id, limit):
+        rows = self._conn().execute(
+            "SELECT id, role, text, timestamp, mode, in_reply_to FROM outbox WHERE id > ? ORDER BY id LIMIT ?",
+            (after_id, limit),
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+    def trace_after(self, after_id, limit):
+        rows = self._conn().execute(
+            "SELECT id, timestamp, event, detail_json, spans_json FROM trace WHERE id > ? ORDER BY id LIMIT ?",
+            (after_id, limit),
+        ).fetchall()
+        out = []
+        for row in rows:
+            item = {"id": row["id"], "timestamp": row["timestamp"], "event": row["event"], "detail": json.loads(row["detail_json"])}
+            if row["spans_json"] is not None:
+                item["spans"] = json.loads(row["spans_json"])
+            out.append(item)
+        return out
+
+    def thoughts_after(self, after_id, limit):
+        rows = self._conn().execute(
+            "SELECT id, timestamp, raw, public, model, mode, sender, in_reply_to FROM thoughts "
+            "WHERE id > ? ORDER BY id LIMIT ?",
+            (after_id, limit),
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+    def count(self, table):
+        return self._conn().execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+    # --- published state ---
+    def publish(self, key, value):
+        conn = self._conn()
+        with conn:
+            conn.execute(PUBLISH_SQL, (key, json.dumps(value, default=str), time.time()))
+
+    def publish_many(self, values):
+        conn = self._conn()
+        now = time.time()
+        with conn:
+            conn.executemany(PUBLISH_SQL, [(key, json.dumps(value, default=str), now) for key, value in values.items()])
+
+    def read(self, key):
+        row = self._conn().execute(READ_SQL, (key,)).fetchone()
+        return json.loads(row["value"]) if row else None
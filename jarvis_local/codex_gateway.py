@@ -34,6 +34,16 @@ def _post(path, payload):
     return resp.json()
 
 
+def cmd_profile(args):
+    url = f"{BASE_URL}/operator/profile"
+    params = {"seconds": args.seconds, "interval_ms": args.interval_ms}
+    resp = requests.get(url, params=params, headers=_headers(), timeout=args.seconds + 20)
+    resp.raise_for_status()
+    with open(args.out, "w") as f:
+        f.write(resp.text)
+    print(f"Wrote {len(resp.text.splitlines())} collapsed stacks to {args.out}")
+
+
 def cmd_state(_args):
     print(json.dumps(_get("/operator/state"), indent=2))
 
@@ -67,10 +77,34 @@ def cmd_live(_args):
     print(json.dumps(_get("/operator/live"), indent=2))
 
 
+WATCH_FIELDS = [
+    "trace.id",
+    "trace.event",
+    "trace.detail",
+    "thoughts.id",
+    "thoughts.mode",
+    "thoughts.model",
+    "thoughts.raw",
+    "messages.id",
+    "messages.role",
+    "messages.text",
+]
+WATCH_STATE_FIELDS = [
+    "state.mood",
+    "state.energy",
+    "state.last_model_used",
+    "state.queue_depth",
+    "emotions.drives",
+]
+
+
 def cmd_watch(args):
+    fields = ",".join(WATCH_FIELDS + (WATCH_STATE_FIELDS if args.print_state else []))
     trace_id = 0
     thought_id = 0
     msg_id = 0
+    state, emotions = {}, {}
+    state_version = emotions_version = ""
     print(f"[{datetime.utcnow().isoformat()}Z] Watching {BASE_URL} ...")
     while True:
         payload = _get(
@@ -79,10 +113,17 @@ def cmd_watch(args):
                 "after_trace_id": trace_id,
                 "after_thought_id": thought_id,
                 "after_message_id": msg_id,
+                "fields": fields,
+                "thought_chars": 200,
+                "state_since": state_version,
+                "emotions_since": emotions_version,
             },
         )
-        state = payload.get("state", {})
-        emotions = payload.get("emotions", {})
+        # state/emotions arrive as deltas against the version we last saw.
+        state.update(payload.get("state", {}))
+        emotions.update(payload.get("emotions", {}))
+        state_version = payload.get("state_version", state_version)
+        emotions_version = payload.get("emotions_version", emotions_version)
         if args.print_state:
             print(
                 f"STATE mood={state.get('mood')} energy={state.get('energy')} "
@@ -136,6 +177,12 @@ def build_parser():
     p = sub.add_parser("live", help="One-shot live aggregate snapshot")
     p.set_defaults(func=cmd_live)
 
+    p = sub.add_parser("profile", help="Sample the inference thread into a collapsed-stack file")
+    p.add_argument("--seconds", type=float, default=10.0)
+    p.add_argument("--interval-ms", type=int, default=10)
+    p.add_argument("--out", default="jarvis-inference.collapsed")
+    p.set_defaults(func=cmd_profile)
+
     p = sub.add_parser("watch", help="Continuously watch trace/thoughts/messages")
     p.add_argument("--interval", type=float, default=2.0)
     p.add_argument("--print-state", action="store_true")
@@ -0,0 +1,252 @@
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+
+# --- CONVERSATION CONTEXT (TOKEN BUDGET + ROLLING SUMMARIES) ---
+
+
+def estimate_tokens(text):
+    # Cheap stand-in for a tokenizer: BPE vocabularies land near 4 chars or 0.75 words per token for English,
+    # so take whichever is larger to stay on the safe side for code and punctuation-heavy text.
+    if not text:
+        return 0
+    return max(len(text) // 4, (text.count(" ") + 1) * 4 // 3) + 1
+
+
+class Turn:
+    __slots__ = ("role", "text", "tokens")
+
+    def __init__(self, role, text):
+        self.role = role
+        self.text = text
+        self.tokens = estimate_tokens(text) + 2
+
+
+class Session:
+    __slots__ = ("turns", "summary", "summary_tokens", "revision", "rendered")
+
+    def __init__(self, max_turns):
+        self.turns = deque(maxlen=max_turns)
+        self.summary = ""
+        self.summary_tokens = 0
+        self.revision = 0
+        self.rendered = None
+
+
+class ConversationStore:
+    def __init__(self, summarizer, budget_tokens=600, summary_after_turns=6, max_turns=200, max_sessions=64):
+        # summarizer(prior_summary, [(role, text), ...]) -> new summary text; runs on a background thread.
+        self.summarizer = summarizer
+        self.budget_tokens = budget_tokens
+        self.summary_after_turns = summary_after_turns
+        self.max_turns = max_turns
+        self.max_sessions = max_sessions
+        self.sessions = OrderedDict()
+        self.lock = threading.Lock()
+        self.pending = set()
+        self.pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="summarizer")
+        self.counters = {"summaries": 0, "summary_failures": 0, "render_cache_hits": 0}
+
+    def add(self, session_id, role, text):
+        if not text:
+            return
+        with self.lock:
+            session = self.sessions.get(session_id)
+            if session is None:
+                session = self.sessions[session_id] = Session(self.max_turns)
+                while len(self.sessions) > self.max_sessions:
+                    self.sessions.popitem(last=False)
+            self.sessions.move_to_end(session_id)
+            session.turns.append(Turn(role, text))
+            session.revision += 1
+
+    def _fit(self, session):
+        # Newest turns first until the budget (minus the summary) is spent; returns how many recent turns fit.
+        used = session.summary_tokens
+        kept = 0
+        for turn in reversed(session.turns):
+            if used + turn.tokens > self.budget_tokens:
+                break
+            used += turn.tokens
+            kept += 1
+        return kept, used
+
+    def render(self, session_id):
+        with self.lock:
+            session = self.sessions.get(session_id)
+            if session is None:
+                return ""
+            if session.rendered is not None and session.rendered[0] == session.revision:
+                self.counters["render_cache_hits"] += 1
+                return session.rendered[1]
+            kept, _ = self._fit(session)
+            overflow = len(session.turns) - kept
+            if overflow >= self.summary_after_turns and session_id not in self.pending:
+                self.pending.add(session_id)
+                self.pool.submit(self._summarize, session_id)
+            lines = []
+            if session.summary:
+                lines.append(f"Earlier conversation (summary): {session.summary}")
+            turns = list(session.turns)
+            for turn in turns[len(turns) - kept:]:
+                lines.append(f"{turn.role}: {turn.text}")
+            text = "\n".join(lines)
+            session.rendered = (session.revision, text)
+            return text
+
+    def _summarize(self, session_id):
+        try:
+            with self.lock:
+                session = self.sessions.get(session_id)
+                if session is None:
+                    return
+                kept, _ = self._fit(session)
+                count = len(session.turns) - kept
+                if count <= 0:
+                    return
+                prior = session.summary
+                older = [(turn.role, turn.text) for turn in list(session.turns)[:count]]
+            try:
+                summary = (self.summarizer(prior, older) or "").strip()
+                self.counters["summaries"] += 1
+            except Exception:
+                self.counters["summary_failures"] += 1
+                summary = ""
+            if not summary:
+                # Extractive fallback keeps the first line of each folded turn so nothing silently disappears.
+                summary = " ".join(filter(None, [prior] + [f"{role}: {text.splitlines()[0][:160]}" for role, text in older]))
+            summary = summary[: self.budget_tokens * 2]
+            with self.lock:
+                # New turns only ever append on the right, so the oldest `count` are still the ones summarised.
+                for _ in range(min(count, len(session.turns))):
+                    session.turns.popleft()
+                session.summary = summary
+                session.summary_tokens = estimate_tokens(summary)
+                session.revision += 1
+        finally:
+            with self.lock:
+                self.pending.discard(session_id)
+
+    def export(self):
+        with self.lock:
+            return {
+                session_id: {"summary": session.summary, "turns": [[t.role, t.text] for t in session.turns]}
+                for session_id, session in self.sessions.items()
+            }
+
+    def restore(self, sessions):
+        for session_id, data in sessions.items():
+            for role, text in data.get("turns", []):
+                self.add(session_id, role, text)
+            with self.lock:
+                session = self.sessions.get(session_id)
+                if session is None:
+                    session = self.sessions[session_id] = Session(self.max_turns)
+                session.summary = data.get("summary", "")
+                session.summary_tokens = estimate_tokens(session.summary)
+                session.revision += 1
+
+    def stats(self):
+        with self.lock:
+            return {
+                "sessions": len(self.sessions),
+                "turns": sum(len(s.turns) for s in self.sessions.values()),
+                "budget_tokens": self.budget_tokens,
+                "pending_summaries": len(self.pending),
+                **self.counters,
+            }
+
+
+# --- CONTEXT WINDOW SIZING (PER-MODEL PROMPT, OUTPUT AND SPEED HISTORY) ---
+# Substrings Ollama/llama.cpp use when a context allocation does not fit in memory.
+MEMORY_ERROR_MARKERS = ("out of memory", "more system memory", "unable to allocate", "cudamalloc", "failed to allocate")
+
+
+def is_memory_error(exc):
+    text = str(exc).lower()
+    return any(marker in text for marker in MEMORY_ERROR_MARKERS)
+
+
+class ContextSizer:
+    # num_ctx is rounded up to a power of two so steady traffic reuses a few sizes: every distinct num_ctx
+    # makes Ollama reload the runner, which costs far more than the spare slots.
+    def __init__(self, output_budgets, min_ctx=512, max_ctx=4096, min_predict=64):
+        self.output_budgets = output_budgets
+        self.min_ctx = min_ctx
+        self.max_ctx = max(min_ctx, max_ctx)
+        self.min_predict = min_predict
+        self.models = {}
+        self.lock = threading.Lock()
+
+    def _history(self, model):
+        history = self.models.get(model)
+        if history is None:
+            history = self.models[model] = {
+                "prompt_ratio": 1.0, "tokens_per_sec": None, "ctx_ceiling": None, "outputs": {}, "memory_errors": 0,
+                "truncated": 0,
+            }
+        return history
+
+    def plan(self, model, messages, mode, remaining_sec=None):
+        # Returns (num_ctx, num_predict, estimated_prompt_tokens, fits).
+        estimate = sum(estimate_tokens(m["content"]) + 8 for m in messages)
+        budget = self.output_budgets.get(mode, self.output_budgets["default"])
+        with self.lock:
+            history = self._history(model)
+            prompt_tokens = int(estimate * history["prompt_ratio"]) + 1
+            # Models that habitually run long (reasoning traces) get room for their usual output, within reason.
+            # Only finished replies are averaged, so a model stuck at the cap cannot talk the cap upwards.
+            observed = history["outputs"].get(mode)
+            num_predict = budget if observed is None else min(max(budget, int(observed * 1.25)), budget * 4)
+            if remaining_sec is not None and history["tokens_per_sec"]:
+                num_predict = min(num_predict, int(remaining_sec * history["tokens_per_sec"]))
+            num_predict = max(self.min_predict, num_predict)
+            ceiling = min(self.max_ctx, history["ctx_ceiling"] or self.max_ctx)
+        need = prompt_tokens + num_predict
+        num_ctx = self.min_ctx
+        while num_ctx < need and num_ctx < ceiling:
+            num_ctx *= 2
+        num_ctx = min(num_ctx, ceiling)
+        return num_ctx, num_predict, estimate, need <= num_ctx
+
+    def observe(self, model, mode, estimate, response, num_predict):
+        get = getattr(response, "get", None)
+        if get is None:
+            return
+        prompt_count, eval_count, eval_ns = get("prompt_eval_count"), get("eval_count"), get("eval_duration")
+        truncated = get("done_reason") == "length" or bool(eval_count and eval_count >= num_predict)
+        with self.lock:
+            history = self._history(model)
+            if prompt_count and estimate:
+                ratio = prompt_count / estimate
+                # Ollama reports only the uncached part of a prompt, so low ratios mean a KV-cache hit, not a miscount.
+                if ratio >= 0.5:
+                    history["prompt_ratio"] = 0.8 * history["prompt_ratio"] + 0.2 * min(ratio, 3.0)
+            if truncated:
+                history["truncated"] += 1
+            elif eval_count:
+                outputs = history["outputs"]
+                outputs[mode] = eval_count if mode not in outputs else 0.8 * outputs[mode] + 0.2 * eval_count
+            if eval_count and eval_ns:
+                rate = eval_count / (eval_ns / 1e9)
+                previous = history["tokens_per_sec"]
+                history["tokens_per_sec"] = rate if previous is None else 0.8 * previous + 0.2 * rate
+
+    def memory_error(self, model, num_ctx):
+        with self.lock:
+            history = self._history(model)
+            history["memory_errors"] += 1
+            history["ctx_ceiling"] = max(self.min_ctx, num_ctx // 2)
+            return history["ctx_ceiling"]
+
+    def stats(self):
+        with self.lock:
+            return {
+                "min_ctx": self.min_ctx,
+                "max_ctx": self.max_ctx,
+                "output_budgets": dict(self.output_budgets),
+                "models": {
+                    model: dict(history, outputs={k: round(v, 1) for k, v in history["outputs"].items()})
+                    for model, history in self.models.items()
+                },
+            }
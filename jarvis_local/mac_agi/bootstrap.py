@@ -16,6 +16,17 @@ REQUIRED_APP_FILES = [
     "boot.py",
     "emotion_engine.py",
     "soul.py",
+    "profiler.py",
+    "web_fetch.py",
+    "web_search.py",
+    "tool_runtime.py",
+    "tool_parser.py",
+    "retention.py",
+    "memory_index.py",
+    "conversation.py",
+    "broker.py",
+    "vision.py",
+    "wire_format.py",
     "codex_gateway.py",
 ]
 
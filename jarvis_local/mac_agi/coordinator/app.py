@@ -1,19 +1,40 @@
 #!/usr/bin/env python3
+import base64
+import hashlib
+import json
 import os
-import sqlite3
 import uuid
-from datetime import datetime, timezone
-from typing import Any, Dict, List, Optional
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
 
-from fastapi import FastAPI, Header, HTTPException
+from fastapi import FastAPI, Header, HTTPException, Query, Response
 from pydantic import BaseModel, Field
 
+from storage import HeartbeatBuffer, LivenessSweeper, NodeStore
+
 DB_PATH = os.environ.get("HIVE_DB_PATH", os.path.expanduser("~/.jarvis_hive/coordinator.db"))
 API_KEY = os.environ.get("HIVE_API_KEY", "")
 HOST = os.environ.get("HIVE_HOST", "0.0.0.0")
 PORT = int(os.environ.get("HIVE_PORT", "9000"))
+HEARTBEAT_FLUSH_SEC = float(os.environ.get("HIVE_HEARTBEAT_FLUSH_SEC", "2"))
+STALE_AFTER_SEC = float(os.environ.get("HIVE_STALE_AFTER_SEC", "90"))
+OFFLINE_AFTER_SEC = float(os.environ.get("HIVE_OFFLINE_AFTER_SEC", "600"))
+SWEEP_INTERVAL_SEC = float(os.environ.get("HIVE_SWEEP_INTERVAL_SEC", "15"))
+MAX_BULK_HEARTBEATS = 5000
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
 
 app = FastAPI(title="Jarvis Hive Coordinator", version="0.1.0")
+store = NodeStore(DB_PATH)
+STORE_EPOCH = uuid.uuid4().hex[:8]
+heartbeats = HeartbeatBuffer(store, flush_interval_sec=HEARTBEAT_FLUSH_SEC)
+sweeper = LivenessSweeper(
+    store,
+    heartbeats,
+    stale_after_sec=STALE_AFTER_SEC,
+    offline_after_sec=OFFLINE_AFTER_SEC,
+    interval_sec=SWEEP_INTERVAL_SEC,
+)
 
 
 class RegisterNodeRequest(BaseModel):
@@ -25,38 +46,32 @@ class RegisterNodeRequest(BaseModel):
     consent: Dict[str, Any] = Field(default_factory=dict)
 
 
+class BulkHeartbeatRequest(BaseModel):
+    node_ids: List[str] = Field(min_length=1, max_length=MAX_BULK_HEARTBEATS)
+
+
 def _utc_now() -> str:
     return datetime.now(timezone.utc).isoformat()
 
 
-def _connect() -> sqlite3.Connection:
-    os.makedirs(os.path.dirname(DB_PATH), exist_ok=True)
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    return conn
-
-
-def _init_db() -> None:
-    conn = _connect()
-    conn.execute(
-        """
-        CREATE TABLE IF NOT EXISTS nodes (
-            id TEXT PRIMARY KEY,
-            node_id TEXT UNIQUE NOT NULL,
-            node_label TEXT NOT NULL,
-            platform TEXT NOT NULL,
-            workspace TEXT NOT NULL,
-            capabilities_json TEXT NOT NULL,
-            consent_json TEXT NOT NULL,
-            status TEXT NOT NULL,
-            created_at TEXT NOT NULL,
-            updated_at TEXT NOT NULL,
-            last_seen_at TEXT NOT NULL
-        )
-        """
-    )
-    conn.commit()
-    conn.close()
+def _encode_cursor(row: Dict[str, Any]) -> str:
+    raw = json.dumps([row["updated_at"], row["node_id"]]).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> Tuple[str, str]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        updated_at, node_id = json.loads(raw)
+        return str(updated_at), str(node_id)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def _list_etag(*parts: Any) -> str:
+    # The store version moves on every committed write, so equal versions mean an identical page.
+    digest = hashlib.sha1(repr((STORE_EPOCH, store.version) + parts).encode("utf-8")).hexdigest()[:20]
+    return f'W/"{digest}"'
 
 
 def _require_api_key(authorization: Optional[str]) -> None:
@@ -71,12 +86,21 @@ def _require_api_key(authorization: Optional[str]) -> None:
 
 @app.on_event("startup")
 def startup() -> None:
-    _init_db()
+    store.init_schema()
+    heartbeats.start()
+    sweeper.start()
+
+
+@app.on_event("shutdown")
+def shutdown() -> None:
+    sweeper.stop()
+    heartbeats.stop()
+    store.close()
 
 
 @app.get("/health")
 def health() -> Dict[str, Any]:
-    return {"ok": True, "service": "hive-coordinator", "db_path": DB_PATH}
+    return {"ok": True, "service": "hive-coordinator", "db_path": DB_PATH, "heartbeats": heartbeats.stats()}
 
 
 @app.post("/api/v1/nodes/register")
@@ -84,53 +108,19 @@ def register_node(item: RegisterNodeRequest, authorization: Optional[str] = Head
     _require_api_key(authorization)
 
     now = _utc_now()
-    conn = _connect()
-    row = conn.execute("SELECT id FROM nodes WHERE node_id = ?", (item.node_id,)).fetchone()
-    if row:
-        node_pk = row["id"]
-        conn.execute(
-            """
-            UPDATE nodes
-            SET node_label = ?, platform = ?, workspace = ?, capabilities_json = ?,
-                consent_json = ?, status = ?, updated_at = ?, last_seen_at = ?
-            WHERE node_id = ?
-            """,
-            (
-                item.node_label,
-                item.platform,
-                item.workspace,
-                str(item.capabilities),
-                str(item.consent),
-                "active",
-                now,
-                now,
-                item.node_id,
-            ),
-        )
-    else:
-        node_pk = f"node_{uuid.uuid4().hex[:12]}"
-        conn.execute(
-            """
-            INSERT INTO nodes (id, node_id, node_label, platform, workspace, capabilities_json,
-                               consent_json, status, created_at, updated_at, last_seen_at)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """,
-            (
-                node_pk,
-                item.node_id,
-                item.node_label,
-                item.platform,
-                item.workspace,
-                str(item.capabilities),
-                str(item.consent),
-                "active",
-                now,
-                now,
-                now,
-            ),
-        )
-    conn.commit()
-    conn.close()
+    node_pk = store.upsert_node(
+        f"node_{uuid.uuid4().hex[:12]}",
+        {
+            "node_id": item.node_id,
+            "node_label": item.node_label,
+            "platform": item.platform,
+            "workspace": item.workspace,
+            "capabilities": item.capabilities,
+            "consent": item.consent,
+        },
+        now,
+    )
+    heartbeats.mark([(item.node_id, "active")])
 
     return {
         "ok": True,
@@ -144,32 +134,67 @@ def register_node(item: RegisterNodeRequest, authorization: Optional[str] = Head
 
 
 @app.get("/api/v1/nodes")
-def list_nodes(authorization: Optional[str] = Header(default=None)) -> Dict[str, Any]:
+def list_nodes(
+    response: Response,
+    limit: int = Query(default=DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    status: Optional[str] = None,
+    platform: Optional[str] = None,
+    capability: Optional[str] = None,
+    authorization: Optional[str] = Header(default=None),
+    if_none_match: Optional[str] = Header(default=None),
+) -> Any:
+    _require_api_key(authorization)
+    etag = _list_etag(limit, cursor, status, platform, capability)
+    if if_none_match and etag in [tag.strip() for tag in if_none_match.split(",")]:
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "no-cache"})
+
+    after = _decode_cursor(cursor) if cursor else None
+    nodes = store.list_nodes(limit + 1, after=after, status=status, platform=platform, capability=capability)
+    next_cursor = _encode_cursor(nodes[limit - 1]) if len(nodes) > limit else None
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "no-cache"
+    return {"ok": True, "nodes": nodes[:limit], "next_cursor": next_cursor}
+
+
+@app.get("/api/v1/nodes/summary")
+def nodes_summary(authorization: Optional[str] = Header(default=None)) -> Dict[str, Any]:
+    _require_api_key(authorization)
+    by_status = heartbeats.status_counts()
+    return {"ok": True, "total": sum(by_status.values()), "by_status": by_status, "sweeper": sweeper.stats()}
+
+
+@app.get("/api/v1/nodes/query")
+def query_nodes(
+    capability: str = Query(min_length=1),
+    seen_within_sec: int = Query(default=300, ge=1),
+    limit: int = Query(default=DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    authorization: Optional[str] = Header(default=None),
+) -> Dict[str, Any]:
     _require_api_key(authorization)
-    conn = _connect()
-    rows = conn.execute(
-        "SELECT id, node_id, node_label, platform, workspace, status, last_seen_at, updated_at FROM nodes ORDER BY updated_at DESC"
-    ).fetchall()
-    conn.close()
-    return {"ok": True, "nodes": [dict(r) for r in rows]}
+    seen_since = (datetime.now(timezone.utc) - timedelta(seconds=seen_within_sec)).isoformat()
+    nodes = store.nodes_with_capability(capability, seen_since, limit)
+    return {"ok": True, "capability": capability, "seen_since": seen_since, "nodes": nodes}
 
 
 @app.post("/api/v1/nodes/{node_id}/heartbeat")
 def heartbeat(node_id: str, authorization: Optional[str] = Header(default=None)) -> Dict[str, Any]:
     _require_api_key(authorization)
     now = _utc_now()
-    conn = _connect()
-    updated = conn.execute(
-        "UPDATE nodes SET last_seen_at = ?, updated_at = ?, status = 'active' WHERE node_id = ?",
-        (now, now, node_id),
-    ).rowcount
-    conn.commit()
-    conn.close()
-    if updated == 0:
+    accepted, _ = heartbeats.record([node_id], now)
+    if not accepted:
         raise HTTPException(status_code=404, detail="Node not found")
     return {"ok": True, "node_id": node_id, "last_seen_at": now}
 
 
+@app.post("/api/v1/nodes/heartbeat")
+def bulk_heartbeat(item: BulkHeartbeatRequest, authorization: Optional[str] = Header(default=None)) -> Dict[str, Any]:
+    _require_api_key(authorization)
+    now = _utc_now()
+    accepted, unknown = heartbeats.record(item.node_ids, now)
+    return {"ok": True, "accepted": len(accepted), "unknown": unknown, "last_seen_at": now}
+
+
 if __name__ == "__main__":
     import uvicorn
 
@@ -0,0 +1,418 @@
+import ast
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger("hive-coordinator")
+
+SCHEMA_SQL = """
+CREATE TABLE IF NOT EXISTS nodes (
+    id TEXT PRIMARY KEY,
+    node_id TEXT UNIQUE NOT NULL,
+    node_label TEXT NOT NULL,
+    platform TEXT NOT NULL,
+    workspace TEXT NOT NULL,
+    capabilities_json TEXT NOT NULL,
+    consent_json TEXT NOT NULL,
+    status TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL,
+    last_seen_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_nodes_updated ON nodes (updated_at DESC, node_id DESC);
+CREATE INDEX IF NOT EXISTS idx_nodes_status_updated ON nodes (status, updated_at DESC, node_id DESC);
+CREATE INDEX IF NOT EXISTS idx_nodes_platform_updated ON nodes (platform, updated_at DESC, node_id DESC);
+CREATE INDEX IF NOT EXISTS idx_nodes_last_seen ON nodes (last_seen_at);
+CREATE INDEX IF NOT EXISTS idx_nodes_status_last_seen ON nodes (status, last_seen_at);
+CREATE TABLE IF NOT EXISTS node_capabilities (
+    capability TEXT NOT NULL,
+    node_id TEXT NOT NULL,
+    PRIMARY KEY (capability, node_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_node_capabilities_node ON node_capabilities (node_id);
+"""
+SCHEMA_VERSION = 1
+
+# Statements are module constants so every pooled connection reuses its compiled copy
+# from the sqlite3 statement cache instead of re-preparing per request.
+SELECT_NODE_PK_SQL = "SELECT id FROM nodes WHERE node_id = ?"
+UPDATE_NODE_SQL = """
+UPDATE nodes
+SET node_label = ?, platform = ?, workspace = ?, capabilities_json = ?,
+    consent_json = ?, status = ?, updated_at = ?, last_seen_at = ?
+WHERE node_id = ?
+"""
+INSERT_NODE_SQL = """
+INSERT INTO nodes (id, node_id, node_label, platform, workspace, capabilities_json,
+                   consent_json, status, created_at, updated_at, last_seen_at)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+LIST_NODES_SELECT = (
+    "SELECT id, node_id, node_label, platform, workspace, capabilities_json, status, last_seen_at, updated_at FROM nodes"
+)
+LIST_NODES_ORDER = " ORDER BY updated_at DESC, node_id DESC LIMIT ?"
+DELETE_CAPABILITIES_SQL = "DELETE FROM node_capabilities WHERE node_id = ?"
+INSERT_CAPABILITY_SQL = "INSERT OR IGNORE INTO node_capabilities (capability, node_id) VALUES (?, ?)"
+QUERY_BY_CAPABILITY_SQL = """
+SELECT n.id, n.node_id, n.node_label, n.platform, n.workspace, n.capabilities_json, n.status, n.last_seen_at, n.updated_at
+FROM node_capabilities c
+JOIN nodes n ON n.node_id = c.node_id
+WHERE c.capability = ? AND n.last_seen_at >= ?
+ORDER BY n.last_seen_at DESC
+LIMIT ?
+"""
+# Heartbeats only touch liveness columns; updated_at tracks registration changes so listings stay stable.
+HEARTBEAT_SQL = "UPDATE nodes SET last_seen_at = ?, status = 'active' WHERE node_id = ? AND last_seen_at < ?"
+ALL_NODE_STATUSES_SQL = "SELECT node_id, status FROM nodes"
+# Status state machine: active -> stale -> offline, with a heartbeat or registration returning a node to active.
+# Both transitions run as one UPDATE; each OR branch is a range scan on idx_nodes_status_last_seen,
+# so offline nodes are never revisited.
+SWEEP_SQL = """
+UPDATE nodes
+SET status = CASE WHEN last_seen_at < :offline_cutoff THEN 'offline' ELSE 'stale' END
+WHERE (status = 'active' AND last_seen_at < :stale_cutoff)
+   OR (status = 'stale' AND last_seen_at < :offline_cutoff)
+RETURNING node_id, status
+"""
+
+PRAGMAS = (
+    "PRAGMA journal_mode = WAL",
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA cache_size = -16000",
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA mmap_size = 67108864",
+    "PRAGMA busy_timeout = 5000",
+)
+
+
+def _parse_legacy(raw: str, expected: type) -> Any:
+    for parse in (json.loads, ast.literal_eval):
+        try:
+            value = parse(raw)
+        except Exception:
+            continue
+        if isinstance(value, expected):
+            return value
+    return expected()
+
+
+def _node_row(row: sqlite3.Row) -> Dict[str, Any]:
+    node = dict(row)
+    node["capabilities"] = json.loads(node.pop("capabilities_json"))
+    return node
+
+
+# One WAL-mode connection per worker thread; handlers never pay connection setup after warm-up.
+class NodeStore:
+    def __init__(self, db_path: str) -> None:
+        self.db_path = db_path
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
+        self._version_lock = threading.Lock()
+        self.version = 0
+
+    def _bump_version(self) -> None:
+        with self._version_lock:
+            self.version += 1
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+            conn = sqlite3.connect(self.db_path, timeout=5.0, cached_statements=256, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            for pragma in PRAGMAS:
+                conn.execute(pragma)
+            self._local.conn = conn
+            with self._connections_lock:
+                self._connections.append(conn)
+        return conn
+
+    def init_schema(self) -> None:
+        conn = self._conn()
+        with conn:
+            conn.executescript(SCHEMA_SQL)
+        if conn.execute("PRAGMA user_version").fetchone()[0] < 1:
+            self._migrate_v1(conn)
+
+    def _migrate_v1(self, conn: sqlite3.Connection) -> None:
+        # v0 stored capabilities/consent as Python reprs; rewrite them as JSON and fill the capability table.
+        rows = conn.execute("SELECT node_id, capabilities_json, consent_json FROM nodes").fetchall()
+        with conn:
+            for row in rows:
+                capabilities = [str(c) for c in _parse_legacy(row["capabilities_json"], list)]
+                consent = _parse_legacy(row["consent_json"], dict)
+                conn.execute(
+                    "UPDATE nodes SET capabilities_json = ?, consent_json = ? WHERE node_id = ?",
+                    (json.dumps(capabilities), json.dumps(consent), row["node_id"]),
+                )
+                conn.execute(DELETE_CAPABILITIES_SQL, (row["node_id"],))
+                conn.executemany(INSERT_CAPABILITY_SQL, [(c, row["node_id"]) for c in capabilities])
+            conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        logger.info(f"Migrated {len(rows)} nodes to schema version {SCHEMA_VERSION}")
+
+    def close(self) -> None:
+        with self._connections_lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
+        self._local = threading.local()
+
+    def upsert_node(self, node_pk: str, fields: Dict[str, Any], now: str) -> str:
+        capabilities = list(dict.fromkeys(fields["capabilities"]))
+        capabilities_json = json.dumps(capabilities)
+        consent_json = json.dumps(fields["consent"])
+        conn = self._conn()
+        with conn:
+            row = conn.execute(SELECT_NODE_PK_SQL, (fields["node_id"],)).fetchone()
+            if row:
+                node_pk = row["id"]
+                conn.execute(
+                    UPDATE_NODE_SQL,
+                    (
+                        fields["node_label"],
+                        fields["platform"],
+                        fields["workspace"],
+                        capabilities_json,
+                        consent_json,
+                        "active",
+                        now,
+                        now,
+                        fields["node_id"],
+                    ),
+                )
+            else:
+                conn.execute(
+                    INSERT_NODE_SQL,
+                    (
+                        node_pk,
+                        fields["node_id"],
+                        fields["node_label"],
+                        fields["platform"],
+                        fields["workspace"],
+                        capabilities_json,
+                        consent_json,
+                        "active",
+                        now,
+                        now,
+                        now,
+                    ),
+                )
+            conn.execute(DELETE_CAPABILITIES_SQL, (fields["node_id"],))
+            conn.executemany(INSERT_CAPABILITY_SQL, [(c, fields["node_id"]) for c in capabilities])
+        self._bump_version()
+        return node_pk
+
+    def list_nodes(
+        self,
+        limit: int,
+        after: Optional[Tuple[str, str]] = None,
+        status: Optional[str] = None,
+        platform: Optional[str] = None,
+        capability: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        # Keyset pagination over (updated_at, node_id); each filter combination maps onto one of the indexes.
+        clauses: List[str] = []
+        params: List[Any] = []
+        if status:
+            clauses.append("status = ?")
+            params.append(status)
+        if platform:
+            clauses.append("platform = ?")
+            params.append(platform)
+        if capability:
+            clauses.append("node_id IN (SELECT node_id FROM node_capabilities WHERE capability = ?)")
+            params.append(capability)
+        if after:
+            clauses.append("(updated_at, node_id) < (?, ?)")
+            params.extend(after)
+        sql = LIST_NODES_SELECT + (" WHERE " + " AND ".join(clauses) if clauses else "") + LIST_NODES_ORDER
+        params.append(limit)
+        return [_node_row(r) for r in self._conn().execute(sql, params).fetchall()]
+
+    def nodes_with_capability(self, capability: str, seen_since: str, limit: int) -> List[Dict[str, Any]]:
+        rows = self._conn().execute(QUERY_BY_CAPABILITY_SQL, (capability, seen_since, limit)).fetchall()
+        return [_node_row(r) for r in rows]
+
+    def node_statuses(self) -> Dict[str, str]:
+        return {r["node_id"]: r["status"] for r in self._conn().execute(ALL_NODE_STATUSES_SQL).fetchall()}
+
+    def sweep(self, stale_cutoff: str, offline_cutoff: str) -> List[Tuple[str, str]]:
+        conn = self._conn()
+        with conn:
+            rows = conn.execute(SWEEP_SQL, {"stale_cutoff": stale_cutoff, "offline_cutoff": offline_cutoff}).fetchall()
+        if rows:
+            self._bump_version()
+        return [(r["node_id"], r["status"]) for r in rows]
+
+    def apply_heartbeats(self, beats: Iterable[Tuple[str, str]]) -> None:
+        conn = self._conn()
+        with conn:
+            changed = conn.executemany(HEARTBEAT_SQL, ((seen, node_id, seen) for node_id, seen in beats)).rowcount
+        if changed:
+            self._bump_version()
+
+
+# Heartbeats land in memory and reach SQLite as one transaction per flush interval,
+# so fsync cost no longer scales with the number of beating nodes.
+class HeartbeatBuffer:
+    def __init__(self, store: NodeStore, flush_interval_sec: float = 2.0) -> None:
+        self.store = store
+        self.flush_interval_sec = flush_interval_sec
+        self._status: Dict[str, str] = {}
+        self._counts: Counter = Counter()
+        self._pending: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.flushes = 0
+        self.flushed_beats = 0
+
+    def start(self) -> None:
+        with self._lock:
+            self._status = self.store.node_statuses()
+            self._counts = Counter(self._status.values())
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="heartbeat-flush", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.flush_interval_sec + 5)
+        self.flush()
+
+    def _set_status(self, node_id: str, status: str) -> None:
+        previous = self._status.get(node_id)
+        if previous == status:
+            return
+        if previous is not None:
+            self._counts[previous] -= 1
+        self._counts[status] += 1
+        self._status[node_id] = status
+
+    def mark(self, transitions: Iterable[Tuple[str, str]]) -> None:
+        with self._lock:
+            for node_id, status in transitions:
+                self._set_status(node_id, status)
+
+    def status_counts(self) -> Dict[str, int]:
+        with self._lock:
+            return {status: n for status, n in self._counts.items() if n}
+
+    def record(self, node_ids: Iterable[str], now: str) -> Tuple[List[str], List[str]]:
+        accepted, unknown = [], []
+        with self._lock:
+            for node_id in node_ids:
+                if node_id in self._status:
+                    self._pending[node_id] = now
+                    self._set_status(node_id, "active")
+                    accepted.append(node_id)
+                else:
+                    unknown.append(node_id)
+        return accepted, unknown
+
+    def flush(self) -> int:
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, {}
+            if batch:
+                self.store.apply_heartbeats(batch.items())
+                self.mark((node_id, "active") for node_id in batch)
+                self.flushes += 1
+                self.flushed_beats += len(batch)
+            return len(batch)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            pending = len(self._pending)
+            known = len(self._status)
+        return {
+            "pending": pending,
+            "known_nodes": known,
+            "flush_interval_sec": self.flush_interval_sec,
+            "flushes": self.flushes,
+            "flushed_beats": self.flushed_beats,
+        }
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.flush_interval_sec):
+            started = time.monotonic()
+            try:
+                self.flush()
+            except Exception as exc:
+                logger.error(f"Heartbeat flush failed: {exc}")
+            if time.monotonic() - started > self.flush_interval_sec:
+                logger.warning("Heartbeat flush took longer than its interval")
+
+
+class LivenessSweeper:
+    def __init__(
+        self,
+        store: NodeStore,
+        heartbeats: HeartbeatBuffer,
+        stale_after_sec: float = 90.0,
+        offline_after_sec: float = 600.0,
+        interval_sec: float = 15.0,
+    ) -> None:
+        self.store = store
+        self.heartbeats = heartbeats
+        self.stale_after_sec = stale_after_sec
+        self.offline_after_sec = max(offline_after_sec, stale_after_sec)
+        self.interval_sec = interval_sec
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.sweeps = 0
+        self.transitions = 0
+        self.last_sweep_at: Optional[str] = None
+
+    def start(self) -> None:
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="liveness-sweep", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval_sec + 5)
+
+    def sweep(self) -> List[Tuple[str, str]]:
+        # Flush first so buffered beats are not mistaken for silence.
+        self.heartbeats.flush()
+        now = datetime.now(timezone.utc)
+        changed = self.store.sweep(
+            (now - timedelta(seconds=self.stale_after_sec)).isoformat(),
+            (now - timedelta(seconds=self.offline_after_sec)).isoformat(),
+        )
+        self.heartbeats.mark(changed)
+        self.sweeps += 1
+        self.transitions += len(changed)
+        self.last_sweep_at = now.isoformat()
+        return changed
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "stale_after_sec": self.stale_after_sec,
+            "offline_after_sec": self.offline_after_sec,
+            "interval_sec": self.interval_sec,
+            "sweeps": self.sweeps,
+            "transitions": self.transitions,
+            "last_sweep_at": self.last_sweep_at,
+        }
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval_sec):
+            try:
+                changed = self.sweep()
+                if changed:
+                    logger.info(f"Liveness sweep moved {len(changed)} nodes")
+            except Exception as exc:
+                logger.error(f"Liveness sweep failed: {exc}")
@@ -91,6 +91,17 @@ fetch() {
 fetch "boot.py" "$SRC_DIR/boot.py"
 fetch "emotion_engine.py" "$SRC_DIR/emotion_engine.py"
 fetch "soul.py" "$SRC_DIR/soul.py"
+fetch "profiler.py" "$SRC_DIR/profiler.py"
+fetch "web_fetch.py" "$SRC_DIR/web_fetch.py"
+fetch "web_search.py" "$SRC_DIR/web_search.py"
+fetch "tool_runtime.py" "$SRC_DIR/tool_runtime.py"
+fetch "tool_parser.py" "$SRC_DIR/tool_parser.py"
+fetch "retention.py" "$SRC_DIR/retention.py"
+fetch "memory_index.py" "$SRC_DIR/memory_index.py"
+fetch "conversation.py" "$SRC_DIR/conversation.py"
+fetch "broker.py" "$SRC_DIR/broker.py"
+fetch "vision.py" "$SRC_DIR/vision.py"
+fetch "wire_format.py" "$SRC_DIR/wire_format.py"
 fetch "codex_gateway.py" "$SRC_DIR/codex_gateway.py"
 
 # Installer support files
@@ -0,0 +1,198 @@
+import math
+import re
+from collections import Counter
+
+# numpy is imported on first use so boot.py keeps its lazy startup.
+np = None
+
+
+def _numpy():
+    global np
+    if np is None:
+        import numpy
+        np = numpy
+    return np
+
+
+# --- LEXICAL MEMORY INDEX (INCREMENTAL BM25 + RANK FUSION) ---
+TOKEN_RE = re.compile(r"[a-z0-9_]+")
+RRF_K = 60
+
+
+def tokenize(text):
+    return TOKEN_RE.findall((text or "").lower())
+
+
+class BM25Index:
+    # Postings are kept per term, so a query only touches documents that share at least one term with it.
+    def __init__(self, k1=1.2, b=0.75):
+        self.k1 = k1
+        self.b = b
+        self.postings = {}
+        self.doc_len = {}
+        self.doc_terms = {}
+        self.total_len = 0
+
+    def __len__(self):
+        return len(self.doc_len)
+
+    def add(self, doc_id, text):
+        if doc_id in self.doc_len:
+            self.remove(doc_id)
+        counts = Counter(tokenize(text))
+        for term, tf in counts.items():
+            self.postings.setdefault(term, {})[doc_id] = tf
+        length = sum(counts.values())
+        self.doc_len[doc_id] = length
+        self.doc_terms[doc_id] = list(counts)
+        self.total_len += length
+
+    def remove(self, doc_id):
+        length = self.doc_len.pop(doc_id, None)
+        if length is None:
+            return
+        self.total_len -= length
+        for term in self.doc_terms.pop(doc_id, ()):
+            docs = self.postings.get(term)
+            if docs is None:
+                continue
+            docs.pop(doc_id, None)
+            if not docs:
+                del self.postings[term]
+
+    def search(self, query, limit=10):
+        n = len(self.doc_len)
+        if not n:
+            return []
+        avg_len = self.total_len / n or 1.0
+        scores = {}
+        for term in set(tokenize(query)):
+            docs = self.postings.get(term)
+            if not docs:
+                continue
+            idf = math.log(1.0 + (n - len(docs) + 0.5) / (len(docs) + 0.5))
+            for doc_id, tf in docs.items():
+                norm = self.k1 * (1.0 - self.b + self.b * self.doc_len[doc_id] / avg_len)
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (self.k1 + 1.0) / (tf + norm)
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        return ranked[:limit]
+
+
+def reciprocal_rank_fusion(rankings, limit=10, k=RRF_K):
+    # rankings: lists of doc ids, best first. Scores are rank-based, so BM25 and cosine scales never need calibrating.
+    fused = {}
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking):
+            fused[doc_id] = fused.get(doc_id, 0.0) + 1.0 / (k + rank + 1)
+    ranked = sorted(fused.items(), key=lambda item: item[1], reverse=True)
+    return ranked[:limit]
+
+
+def mmr(relevance, vectors, k, lam=0.7):
+    # Maximal marginal relevance over a small candidate set: relevance is min-max scaled so BM25, cosine
+    # and RRF scores all work; rows of `vectors` are unit-norm (zero rows count as unlike everything).
+    numpy = _numpy()
+    rel = numpy.asarray(relevance, dtype=numpy.float32)
+    n = rel.shape[0]
+    if n == 0:
+        return []
+    spread = float(rel.max() - rel.min())
+    rel = (rel - rel.min()) / spread if spread > 0 else numpy.ones_like(rel)
+    pairwise = vectors @ vectors.T
+    redundancy = numpy.zeros(n, dtype=numpy.float32)
+    taken = numpy.zeros(n, dtype=bool)
+    picks = []
+    for _ in range(min(k, n)):
+        score = lam * rel - (1.0 - lam) * redundancy
+        score[taken] = -numpy.inf
+        pick = int(numpy.argmax(score))
+        picks.append(pick)
+        taken[pick] = True
+        numpy.maximum(redundancy, pairwise[pick], out=redundancy)
+    return picks
+
+
+# --- VECTOR MEMORY INDEX (UNIT-NORM ROW MATRIX) ---
+class VectorIndex:
+    # Rows are L2-normalised once on insert, so cosine similarity for the whole store is one matrix-vector product.
+    # Removed rows become zeroed tombstones until compact() repacks the matrix.
+    def __init__(self):
+        self.dim = None
+        self.data = None
+        self.ids = []
+        self.rows = {}
+        self.dead = 0
+
+    def __len__(self):
+        return len(self.rows)
+
+    def unit(self, vec):
+        numpy = _numpy()
+        v = numpy.asarray(vec, dtype=numpy.float32)
+        if v.ndim != 1 or (self.dim is not None and v.shape[0] != self.dim):
+            return None
+        norm = float(numpy.linalg.norm(v))
+        return v / norm if norm > 0 else None
+
+    def add(self, doc_id, vec):
+        numpy = _numpy()
+        v = self.unit(vec)
+        if v is None:
+            return False
+        if self.data is None:
+            self.dim = v.shape[0]
+            self.data = numpy.zeros((64, self.dim), dtype=numpy.float32)
+        if doc_id in self.rows:
+            self.remove(doc_id)
+        if len(self.ids) == self.data.shape[0]:
+            self.data = numpy.vstack([self.data, numpy.zeros_like(self.data)])
+        row = len(self.ids)
+        self.data[row] = v
+        self.ids.append(doc_id)
+        self.rows[doc_id] = row
+        return True
+
+    def remove(self, doc_id):
+        row = self.rows.pop(doc_id, None)
+        if row is None:
+            return
+        self.data[row] = 0.0
+        self.ids[row] = None
+        self.dead += 1
+
+    def vector(self, doc_id):
+        row = self.rows.get(doc_id)
+        return None if row is None else self.data[row]
+
+    def matrix(self, doc_ids):
+        numpy = _numpy()
+        out = numpy.zeros((len(doc_ids), self.dim or 1), dtype=numpy.float32)
+        for i, doc_id in enumerate(doc_ids):
+            row = self.rows.get(doc_id)
+            if row is not None:
+                out[i] = self.data[row]
+        return out
+
+    def search(self, vec, limit=10):
+        numpy = _numpy()
+        q = self.unit(vec)
+        if q is None or not self.rows:
+            return []
+        sims = self.data[:len(self.ids)] @ q
+        # Tombstones score 0 and may land in the partition, so over-fetch by their count and filter them out.
+        k = min(limit + self.dead, sims.shape[0])
+        top = numpy.argpartition(-sims, k - 1)[:k]
+        top = top[numpy.argsort(-sims[top])]
+        return [(self.ids[row], float(sims[row])) for row in top if self.ids[row] is not None][:limit]
+
+    def compact(self):
+        numpy = _numpy()
+        live = [row for row, doc_id in enumerate(self.ids) if doc_id is not None]
+        size = max(64, len(live))
+        data = numpy.zeros((size, self.dim), dtype=numpy.float32) if self.dim else None
+        if live:
+            data[:len(live)] = self.data[live]
+        self.data = data
+        self.ids = [self.ids[row] for row in live]
+        self.rows = {doc_id: row for row, doc_id in enumerate(self.ids)}
+        self.dead = 0
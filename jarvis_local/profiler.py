@@ -0,0 +1,108 @@
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+# --- HOT-PATH PROFILER (SPANS + STACK SAMPLING) ---
+_local = threading.local()
+
+
+class CycleProfile:
+    def __init__(self):
+        self.wall_start = time.perf_counter()
+        self.cpu_start = time.thread_time()
+        self.stages = {}
+        self.lock = threading.Lock()
+
+    def add(self, name, wall, cpu):
+        with self.lock:
+            stage = self.stages.get(name)
+            if stage is None:
+                stage = self.stages[name] = {"wall_ms": 0.0, "cpu_ms": 0.0, "calls": 0}
+            stage["wall_ms"] += wall * 1000.0
+            stage["cpu_ms"] += cpu * 1000.0
+            stage["calls"] += 1
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                name: {"wall_ms": round(s["wall_ms"], 2), "cpu_ms": round(s["cpu_ms"], 2), "calls": s["calls"]}
+                for name, s in self.stages.items()
+            }
+
+    def summary(self):
+        return {
+            "wall_ms": round((time.perf_counter() - self.wall_start) * 1000.0, 2),
+            "cpu_ms": round((time.thread_time() - self.cpu_start) * 1000.0, 2),
+            "stages": self.snapshot(),
+        }
+
+
+def current_profile():
+    return getattr(_local, "profile", None)
+
+
+@contextmanager
+def cycle_profile():
+    profile = CycleProfile()
+    _local.profile = profile
+    try:
+        yield profile
+    finally:
+        _local.profile = None
+
+
+@contextmanager
+def attach_profile(profile):
+    # Lets pool threads working for a cycle record their spans into that cycle's profile.
+    previous = current_profile()
+    _local.profile = profile
+    try:
+        yield profile
+    finally:
+        _local.profile = previous
+
+
+@contextmanager
+def span(name):
+    # Spans are inclusive: a nested "embed" span is also counted inside its parent "recall".
+    profile = current_profile()
+    if profile is None:
+        yield
+        return
+    wall0 = time.perf_counter()
+    cpu0 = time.thread_time()
+    try:
+        yield
+    finally:
+        profile.add(name, time.perf_counter() - wall0, time.thread_time() - cpu0)
+
+
+class StackSampler:
+    def __init__(self, interval_sec=0.01):
+        self.interval_sec = interval_sec
+        self.running = threading.Lock()
+
+    def _frame_label(self, frame):
+        code = frame.f_code
+        return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+    def sample(self, thread_id_getter, duration_sec):
+        # Returns a collapsed-stack profile ("root;child;leaf count" per line) for flamegraph.pl / speedscope.
+        counts = Counter()
+        deadline = time.monotonic() + duration_sec
+        while time.monotonic() < deadline:
+            thread_id = thread_id_getter()
+            frame = sys._current_frames().get(thread_id) if thread_id else None
+            if frame is None:
+                counts["[idle]"] += 1
+            else:
+                stack = []
+                while frame is not None:
+                    stack.append(self._frame_label(frame))
+                    frame = frame.f_back
+                counts[";".join(reversed(stack))] += 1
+            time.sleep(self.interval_sec)
+        return "".join(f"{stack} {n}\n" for stack, n in counts.most_common())
@@ -0,0 +1,227 @@
+import json
+import os
+import sys
+import zlib
+from collections import deque
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# --- BOUNDED RETENTION (BYTE BUDGETS, INTERNING, COLD COMPRESSION) ---
+
+
+def approx_size(value):
+    if isinstance(value, str):
+        return sys.getsizeof(value)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(approx_size(k) + approx_size(v) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(approx_size(v) for v in value)
+    return 0
+
+
+class Codec:
+    def __init__(self, name="zlib"):
+        name = (name or "none").strip().lower()
+        if name == "zstd" and zstandard is None:
+            name = "zlib"
+        self.name = name
+        if name == "zstd":
+            self._compressor = zstandard.ZstdCompressor(level=3)
+            self._decompressor = zstandard.ZstdDecompressor()
+
+    @property
+    def enabled(self):
+        return self.name in ("zlib", "zstd")
+
+    def compress(self, data):
+        if self.name == "zstd":
+            return self._compressor.compress(data)
+        return zlib.compress(data, 6)
+
+    def decompress(self, blob):
+        if self.name == "zstd":
+            return self._decompressor.decompress(blob)
+        return zlib.decompress(blob)
+
+
+class TextInterner:
+    # One canonical copy per distinct text, shared by every log that holds it.
+    def __init__(self):
+        self.table = {}
+        self.bytes = 0
+
+    def acquire(self, text):
+        entry = self.table.get(text)
+        if entry is None:
+            entry = self.table[text] = [text, 0]
+            self.bytes += sys.getsizeof(text)
+        entry[1] += 1
+        return entry[0]
+
+    def release(self, text):
+        entry = self.table.get(text)
+        if entry is None:
+            return
+        entry[1] -= 1
+        if entry[1] <= 0:
+            del self.table[text]
+            self.bytes -= sys.getsizeof(text)
+
+
+class Record:
+    __slots__ = ("id", "timestamp", "packed", "nbytes")
+    FIELDS = ()
+    COLD_FIELDS = ()
+
+    def __init__(self, **values):
+        self.packed = None
+        self.nbytes = 0
+        for name in self.FIELDS:
+            setattr(self, name, values.get(name))
+
+    def to_dict(self, codec=None):
+        out = {name: getattr(self, name) for name in self.FIELDS}
+        if self.packed is not None:
+            out.update(json.loads(codec.decompress(self.packed)))
+        return out
+
+
+class ThoughtRecord(Record):
+    __slots__ = ("raw", "public", "model", "mode", "sender", "in_reply_to")
+    FIELDS = ("id", "timestamp", "raw", "public", "model", "mode", "sender", "in_reply_to")
+    COLD_FIELDS = ("raw", "public")
+
+
+class MessageRecord(Record):
+    __slots__ = ("role", "text", "mode", "in_reply_to")
+    FIELDS = ("id", "role", "text", "timestamp", "mode", "in_reply_to")
+    COLD_FIELDS = ("text",)
+
+
+class TraceRecord(Record):
+    __slots__ = ("event", "detail", "spans")
+    FIELDS = ("id", "timestamp", "event", "detail", "spans")
+    COLD_FIELDS = ("detail", "spans")
+
+    def to_dict(self, codec=None):
+        out = super().to_dict(codec)
+        if out.get("spans") is None:
+            out.pop("spans", None)
+        return out
+
+
+class BudgetedLog:
+    # Not thread-safe on its own; CognitiveCore guards every call with its lock.
+    def __init__(self, max_items, max_bytes, interner, codec, hot_items=64):
+        self.items = deque()
+        self.max_items = max_items
+        self.max_bytes = max_bytes
+        self.interner = interner
+        self.codec = codec
+        self.hot_items = max(1, hot_items)
+        self.bytes = 0
+        self.evicted = 0
+        self.compressed = 0
+
+    def __len__(self):
+        return len(self.items)
+
+    def restore(self, rows, record_cls):
+        for row in rows:
+            self.append(record_cls(**row))
+
+    def append(self, record):
+        size = sys.getsizeof(record)
+        for name in record.COLD_FIELDS:
+            value = getattr(record, name)
+            if isinstance(value, str):
+                setattr(record, name, self.interner.acquire(value))
+            size += approx_size(value)
+        record.nbytes = size
+        self.items.append(record)
+        self.bytes += size
+        if self.codec.enabled and len(self.items) > self.hot_items:
+            self._compress(self.items[-self.hot_items - 1])
+        while self.items and (len(self.items) > self.max_items or self.bytes > self.max_bytes):
+            self._evict()
+        return record
+
+    def _release(self, record):
+        for name in record.COLD_FIELDS:
+            value = getattr(record, name)
+            if isinstance(value, str):
+                self.interner.release(value)
+
+    def _compress(self, record):
+        if record.packed is not None:
+            return
+        payload = {name: getattr(record, name) for name in record.COLD_FIELDS}
+        self._release(record)
+        for name in record.COLD_FIELDS:
+            setattr(record, name, None)
+        record.packed = self.codec.compress(json.dumps(payload).encode("utf-8"))
+        size = sys.getsizeof(record) + len(record.packed)
+        self.bytes += size - record.nbytes
+        record.nbytes = size
+        self.compressed += 1
+
+    def _evict(self):
+        record = self.items.popleft()
+        if record.packed is None:
+            self._release(record)
+        self.bytes -= record.nbytes
+        self.evicted += 1
+
+    def after(self, after_id, limit):
+        # Ids only grow, so scan back from the newest entry and stop at the first one already seen.
+        newer = []
+        for record in reversed(self.items):
+            if record.id <= after_id:
+                break
+            newer.append(record)
+        newer.reverse()
+        return [record.to_dict(self.codec) for record in newer[:limit]]
+
+    def stats(self):
+        return {
+            "items": len(self.items),
+            "bytes": self.bytes,
+            "max_items": self.max_items,
+            "max_bytes": self.max_bytes,
+            "compressed": self.compressed,
+            "evicted": self.evicted,
+        }
+
+
+# --- RUNTIME SNAPSHOTS (COMPACT BINARY FILE) ---
+# Layout: 4-byte magic, 1-byte format version, 1-byte codec id, then the codec-compressed JSON payload.
+SNAPSHOT_MAGIC = b"JVSN"
+SNAPSHOT_FORMAT = 1
+SNAPSHOT_CODECS = {"none": 0, "zlib": 1, "zstd": 2}
+
+
+def write_snapshot(path, payload, codec):
+    data = json.dumps(payload, separators=(",", ":"), default=str).encode("utf-8")
+    name = codec.name if codec.enabled else "none"
+    if name != "none":
+        data = codec.compress(data)
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(SNAPSHOT_MAGIC + bytes([SNAPSHOT_FORMAT, SNAPSHOT_CODECS[name]]) + data)
+    os.replace(tmp, path)
+    return len(data) + 6
+
+
+def read_snapshot(path):
+    with open(path, "rb") as f:
+        blob = f.read()
+    if blob[:4] != SNAPSHOT_MAGIC or blob[4] != SNAPSHOT_FORMAT:
+        raise ValueError("not a runtime snapshot")
+    name = {v: k for k, v in SNAPSHOT_CODECS.items()}[blob[5]]
+    data = blob[6:]
+    if name != "none":
+        data = Codec(name).decompress(data)
+    return json.loads(data)
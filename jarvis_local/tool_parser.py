@@ -0,0 +1,141 @@
+import re
+from array import array
+
+# --- TOOL TAG TOKENIZER (SINGLE PASS, NO BACKTRACKING) ---
+# Tag syntax: [NAME: "arg", "arg", ...] or [NAME] for zero-argument tools.
+# A quote closes an argument only when it is followed (after optional whitespace) by "," for
+# leading arguments or "]" for the last one, so unescaped quotes inside code survive; \" is
+# always literal. Closing positions are precomputed once, so every lookup is O(1) and the
+# whole parse stays linear even on adversarial output (unterminated tags, quote floods).
+# An argument never runs across another tool's tag head, and only MULTILINE_TOOLS may span lines,
+# so a truncated tag cannot swallow the well-formed call that follows it.
+TOOL_ARITY = {
+    "SEARCH": 1,
+    "READ": 1,
+    "HTTP": 3,
+    "SCAN_NETWORK": 0,
+    "BUILD": 2,
+    "EXECUTE": 1,
+    "UPLOAD_TO_VAULT": 1,
+}
+MULTILINE_TOOLS = frozenset({"BUILD", "UPLOAD_TO_VAULT"})
+OPEN_QUOTES = ('"', "“")
+CLOSE_QUOTES = ('"', "”")
+WHITESPACE = " \t\r\n"
+TAG_HEAD = re.compile(r"\[\s*([A-Z_]+)\s*([:\]])")
+ARG_OPEN = re.compile(r"\s*([\"“])")
+ESCAPED_QUOTE = re.compile(r"(\\+)([\"“”])")
+
+
+class ToolCall:
+    __slots__ = ("name", "args", "start", "end")
+
+    def __init__(self, name, args, start, end):
+        self.name = name
+        self.args = args
+        self.start = start
+        self.end = end
+
+    def __repr__(self):
+        return f"ToolCall({self.name!r}, {self.args!r})"
+
+
+def _unescape(value):
+    return ESCAPED_QUOTE.sub(lambda m: (m.group(1)[:-1] if len(m.group(1)) % 2 else m.group(1)) + m.group(2), value)
+
+
+def _next_table(n, marks):
+    nxt = array("l", [-1]) * (n + 1)
+    upcoming = -1
+    for k in range(n - 1, -1, -1):
+        if k in marks:
+            upcoming = k
+        nxt[k] = upcoming
+    return nxt
+
+
+def _boundaries(text):
+    # For every index i: the next newline and the next known tool tag head at or after i.
+    n = len(text)
+    newlines = {i for i, ch in enumerate(text) if ch == "\n"}
+    heads = {m.start() for m in TAG_HEAD.finditer(text) if m.group(1) in TOOL_ARITY}
+    return _next_table(n, newlines), _next_table(n, heads)
+
+
+def _closers(text):
+    # For every index i: where the next argument-closing quote at or after i sits, and where parsing resumes after it.
+    n = len(text)
+    comma_at, bracket_at = {}, {}
+    backslashes = 0
+    i = 0
+    while i < n:
+        ch = text[i]
+        if ch == "\\":
+            backslashes += 1
+            i += 1
+            continue
+        if ch in CLOSE_QUOTES and backslashes % 2 == 0:
+            j = i + 1
+            while j < n and text[j] in WHITESPACE:
+                j += 1
+            if j < n and text[j] == ",":
+                comma_at[i] = j + 1
+            elif j < n and text[j] == "]":
+                bracket_at[i] = j + 1
+        backslashes = 0
+        i += 1
+
+    return _next_table(n, comma_at), comma_at, _next_table(n, bracket_at), bracket_at
+
+
+def parse_tool_calls(text, limit=None):
+    text = text or ""
+    calls = []
+    if "[" not in text:
+        return calls
+    next_comma = next_bracket = comma_at = bracket_at = None
+    pos = text.find("[")
+    while pos != -1:
+        head = TAG_HEAD.match(text, pos)
+        arity = TOOL_ARITY.get(head.group(1)) if head else None
+        if arity is None:
+            pos = text.find("[", pos + 1)
+            continue
+        if arity == 0 or head.group(2) == "]":
+            if arity == 0 and head.group(2) == "]":
+                calls.append(ToolCall(head.group(1), [], pos, head.end()))
+                if limit and len(calls) >= limit:
+                    break
+                pos = text.find("[", head.end())
+            else:
+                pos = text.find("[", pos + 1)
+            continue
+
+        if next_comma is None:
+            next_comma, comma_at, next_bracket, bracket_at = _closers(text)
+            next_newline, next_head = _boundaries(text)
+        single_line = head.group(1) not in MULTILINE_TOOLS
+        args = []
+        cursor = head.end()
+        for index in range(arity):
+            opened = ARG_OPEN.match(text, cursor)
+            if not opened:
+                break
+            start = opened.end()
+            last = index == arity - 1
+            close = (next_bracket if last else next_comma)[start]
+            if close == -1 or -1 < next_head[start] < close:
+                break
+            if single_line and -1 < next_newline[start] < close:
+                break
+            # Keep offsets only: slicing before the tag is known to be complete would make failed tags quadratic.
+            args.append((start, close))
+            cursor = (bracket_at if last else comma_at)[close]
+        if len(args) == arity:
+            calls.append(ToolCall(head.group(1), [_unescape(text[a:b]) for a, b in args], pos, cursor))
+            if limit and len(calls) >= limit:
+                break
+            pos = text.find("[", cursor)
+        else:
+            pos = text.find("[", pos + 1)
+    return calls
@@ -0,0 +1,122 @@
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# --- TOOL EXECUTION STAGE (BOUNDED POOL + RESULT CHANNEL) ---
+DEFAULT_TOOL_TIMEOUTS = {
+    "search": 20.0,
+    "read": 20.0,
+    "http": 15.0,
+    "scan_network": 15.0,
+    "execute": 15.0,
+}
+
+
+class ToolExecutor:
+    def __init__(self, max_workers=2, max_pending=16, timeouts=None, default_timeout=20.0):
+        self.pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="tool")
+        self.max_pending = max_pending
+        self.timeouts = dict(DEFAULT_TOOL_TIMEOUTS, **(timeouts or {}))
+        self.default_timeout = default_timeout
+        self.results = queue.Queue()
+        self.lock = threading.Lock()
+        self.jobs = {}
+        self.job_counter = 0
+        self.latency = {}
+        self.counters = {"submitted": 0, "completed": 0, "failed": 0, "timed_out": 0, "rejected": 0, "discarded": 0}
+
+    def submit(self, tool, fn, *args, detail=None):
+        now = time.monotonic()
+        with self.lock:
+            if len(self.jobs) >= self.max_pending:
+                self.counters["rejected"] += 1
+                return None
+            self.job_counter += 1
+            job = {
+                "id": self.job_counter,
+                "tool": tool,
+                "state": "queued",
+                "detail": detail or {},
+                "submitted": now,
+                "deadline": now + self.timeouts.get(tool, self.default_timeout),
+            }
+            self.jobs[job["id"]] = job
+            self.counters["submitted"] += 1
+        self.pool.submit(self._run, job, fn, args)
+        return job["id"]
+
+    def _run(self, job, fn, args):
+        with self.lock:
+            if job["state"] == "timed_out":
+                self.jobs.pop(job["id"], None)
+                return
+            job["state"] = "running"
+        started = time.monotonic()
+        value, error = None, None
+        try:
+            value = fn(*args)
+        except Exception as exc:
+            error = str(exc)
+        elapsed_ms = (time.monotonic() - started) * 1000.0
+        with self.lock:
+            self.jobs.pop(job["id"], None)
+            self._record_latency(job["tool"], elapsed_ms)
+            if job["state"] == "timed_out":
+                self.counters["discarded"] += 1
+                return
+            job["state"] = "done"
+            self.counters["failed" if error else "completed"] += 1
+        self.results.put({
+            "id": job["id"],
+            "tool": job["tool"],
+            "value": value,
+            "error": error,
+            "ms": round(elapsed_ms, 1),
+            "detail": job["detail"],
+        })
+
+    def _record_latency(self, tool, elapsed_ms):
+        stat = self.latency.get(tool)
+        if stat is None:
+            stat = self.latency[tool] = {"count": 0, "avg_ms": 0.0, "last_ms": 0.0, "max_ms": 0.0}
+        stat["count"] += 1
+        stat["avg_ms"] += (elapsed_ms - stat["avg_ms"]) / stat["count"]
+        stat["last_ms"] = elapsed_ms
+        stat["max_ms"] = max(stat["max_ms"], elapsed_ms)
+
+    def poll(self):
+        # Expires overdue jobs (their late results are dropped) and drains whatever finished since the last poll.
+        now = time.monotonic()
+        expired = []
+        with self.lock:
+            for job in self.jobs.values():
+                if job["state"] in ("queued", "running") and now > job["deadline"]:
+                    job["state"] = "timed_out"
+                    self.counters["timed_out"] += 1
+                    expired.append({"id": job["id"], "tool": job["tool"], "detail": job["detail"]})
+        done = []
+        while True:
+            try:
+                done.append(self.results.get_nowait())
+            except queue.Empty:
+                break
+        return done, expired
+
+    def stats(self):
+        with self.lock:
+            states = [job["state"] for job in self.jobs.values()]
+            latency = {
+                tool: {k: (round(v, 1) if isinstance(v, float) else v) for k, v in stat.items()}
+                for tool, stat in self.latency.items()
+            }
+            counters = dict(self.counters)
+        return {
+            "queue_depth": states.count("queued"),
+            "running": states.count("running"),
+            "stuck": states.count("timed_out"),
+            "pending_results": self.results.qsize(),
+            "max_pending": self.max_pending,
+            **counters,
+            "latency": latency,
+        }
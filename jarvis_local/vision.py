@@ -0,0 +1,171 @@
+import hashlib
+import io
+import pickle
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+# --- INCREMENTAL SCREEN OCR (TILE HASHING, PER-TILE TEXT CACHE, OCR PROCESS POOL) ---
+DEFAULT_REGION = (0, 0, 1920, 1080)
+# A pixel row whose brightness spread stays within this is background: the only place a band may be cut.
+BLANK_ROW_SPREAD = 8
+
+# numpy is imported on first use, as in memory_index.
+np = None
+
+
+def _numpy():
+    global np
+    if np is None:
+        import numpy
+        np = numpy
+    return np
+
+
+def _ocr_tile(mode, size, raw):
+    # Runs in a pool process: rebuilds the tile from raw pixels, so nothing touches the disk.
+    import pytesseract
+    from PIL import Image
+    return pytesseract.image_to_string(Image.frombytes(mode, size, raw)).strip()
+
+
+class ScreenSource:
+    # Default capture on macOS; Pillow hands the frame back as an in-memory image.
+    def __init__(self, region=DEFAULT_REGION):
+        left, top, width, height = region
+        self.bbox = (left, top, left + width, top + height)
+
+    def grab(self):
+        from PIL import ImageGrab
+        return ImageGrab.grab(bbox=self.bbox)
+
+
+class SequenceSource:
+    # Replays images, encoded bytes or file paths in order (repeating the last one), for synthetic runs off macOS.
+    def __init__(self, frames):
+        self.frames = list(frames)
+        self.index = 0
+
+    def grab(self):
+        from PIL import Image
+        if not self.frames:
+            return None
+        frame = self.frames[min(self.index, len(self.frames) - 1)]
+        self.index += 1
+        if isinstance(frame, (bytes, bytearray)):
+            return Image.open(io.BytesIO(frame))
+        if isinstance(frame, str):
+            return Image.open(frame)
+        return frame
+
+
+class IncrementalOCR:
+    # Frames are split into about `rows` horizontal bands (times `cols` fixed columns). A tile is only OCR'd when
+    # its pixel hash is new; identical tiles anywhere on screen (or seen before) reuse cached text. Band edges are
+    # moved onto blank pixel rows so a text line is never split; only `cols` > 1 cuts vertically through text.
+    def __init__(self, source, rows=12, cols=1, workers=2, cache_size=512, ocr=None):
+        self.source = source
+        self.rows = max(1, rows)
+        self.cols = max(1, cols)
+        self.workers = workers
+        self.cache_size = cache_size
+        self.ocr = ocr or _ocr_tile
+        self.pool = None
+        self.cache = OrderedDict()
+        self.frame_key = None
+        self.text = ""
+        self.stats = {
+            "frames": 0, "unchanged_frames": 0, "tiles_ocr": 0, "tiles_cached": 0,
+            "ocr_ms": 0.0, "capture_failures": 0, "ocr_failures": 0,
+        }
+
+    def _band_edges(self, raw, width, height):
+        # Each cut goes to the blank row nearest its ideal position within [half, double] a band height;
+        # content with no blank row in that window (images, dense tables) is cut at the ideal position.
+        numpy = _numpy()
+        pixels = numpy.frombuffer(raw, dtype=numpy.uint8).reshape(height, width)
+        blank = numpy.flatnonzero(pixels.max(axis=1) - pixels.min(axis=1) <= BLANK_ROW_SPREAD)
+        target = max(1, height // self.rows)
+        edges, start = [0], 0
+        while height - start > target * 3 // 2:
+            ideal = start + target
+            # Never at or before start: with one-pixel bands target // 2 is 0 and the cut would not advance.
+            lo = numpy.searchsorted(blank, start + max(1, target // 2))
+            hi = numpy.searchsorted(blank, min(height - 1, start + 2 * target), side="right")
+            window = blank[lo:hi]
+            cut = int(window[numpy.argmin(numpy.abs(window - ideal))]) if window.size else ideal
+            edges.append(cut)
+            start = cut
+        edges.append(height)
+        return edges
+
+    def _boxes(self, raw, width, height):
+        edges = self._band_edges(raw, width, height)
+        boxes = []
+        for top, bottom in zip(edges, edges[1:]):
+            for c in range(self.cols):
+                boxes.append((width * c // self.cols, top, width * (c + 1) // self.cols, bottom))
+        return boxes
+
+    def _run(self, jobs):
+        # jobs: [(mode, size, raw)]; the pool is created on first real work and dropped only if the pool itself
+        # fails (cannot start, a worker died, the OCR callable cannot be pickled). OCR errors reach analyze().
+        if self.workers > 1 and len(jobs) > 1:
+            try:
+                if self.pool is None:
+                    self.pool = ProcessPoolExecutor(max_workers=self.workers)
+                return list(self.pool.map(self.ocr, *zip(*jobs)))
+            except (BrokenProcessPool, pickle.PicklingError, OSError):
+                self.shutdown()
+                self.workers = 0
+        return [self.ocr(*job) for job in jobs]
+
+    def analyze(self):
+        try:
+            frame = self.source.grab()
+        except Exception:
+            frame = None
+        if frame is None:
+            self.stats["capture_failures"] += 1
+            return self.text
+        self.stats["frames"] += 1
+        frame = frame.convert("L")
+        raw = frame.tobytes()
+        frame_key = hashlib.blake2b(raw, digest_size=16).digest()
+        if frame_key == self.frame_key:
+            self.stats["unchanged_frames"] += 1
+            return self.text
+        keys, missing = [], {}
+        for box in self._boxes(raw, *frame.size):
+            tile = frame.crop(box)
+            tile_raw = tile.tobytes()
+            key = (tile.size, hashlib.blake2b(tile_raw, digest_size=16).digest())
+            keys.append(key)
+            if key in self.cache:
+                self.cache.move_to_end(key)
+            elif key not in missing:
+                missing[key] = (tile.mode, tile.size, tile_raw)
+        self.stats["tiles_cached"] += len(keys) - len(missing)
+        if missing:
+            started = time.perf_counter()
+            try:
+                texts = self._run(list(missing.values()))
+            except Exception:
+                # Failed tiles stay uncached (and the frame unrecorded) so the next frame retries them.
+                self.stats["ocr_failures"] += 1
+                return "\n".join(t for t in (self.cache.get(k, "") for k in keys) if t)
+            self.stats["ocr_ms"] += (time.perf_counter() - started) * 1000.0
+            self.stats["tiles_ocr"] += len(missing)
+            for key, text in zip(missing, texts):
+                self.cache[key] = text
+            while len(self.cache) > max(self.cache_size, len(keys)):
+                self.cache.popitem(last=False)
+        self.frame_key = frame_key
+        self.text = "\n".join(t for t in (self.cache.get(k, "") for k in keys) if t)
+        return self.text
+
+    def shutdown(self):
+        if self.pool is not None:
+            self.pool.shutdown(wait=False, cancel_futures=True)
+            self.pool = None
@@ -0,0 +1,214 @@
+import codecs
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+from html.parser import HTMLParser
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# --- WEB FETCH LAYER (POOLED, CONDITIONAL, DISK-CACHED) ---
+USER_AGENT = "Mozilla/5.0"
+SKIP_TAGS = {"script", "style", "noscript", "template", "svg"}
+WHITESPACE = re.compile(r"\s+")
+# Expired entries are kept this many TTLs so their validators can still turn a refetch into a 304.
+REVALIDATE_TTLS = 4
+PRUNE_EVERY = 32
+# A .tmp younger than this may be a write in progress in another thread or process; older ones are crash leftovers.
+STALE_TMP_SEC = 300
+
+
+class TextExtractor(HTMLParser):
+    # Streaming replacement for BeautifulSoup(...).get_text(): fed chunk by chunk, stops caring once full.
+    def __init__(self, max_chars):
+        super().__init__(convert_charrefs=True)
+        self.max_chars = max_chars
+        self.parts = []
+        self.size = 0
+        self.skip_depth = 0
+
+    @property
+    def full(self):
+        return self.size >= self.max_chars
+
+    def handle_starttag(self, tag, attrs):
+        if tag in SKIP_TAGS:
+            self.skip_depth += 1
+
+    def handle_endtag(self, tag):
+        if tag in SKIP_TAGS and self.skip_depth:
+            self.skip_depth -= 1
+
+    def handle_data(self, data):
+        if self.skip_depth or self.full:
+            return
+        text = WHITESPACE.sub(" ", data).strip()
+        if text:
+            self.parts.append(text)
+            self.size += len(text) + 1
+
+    def text(self):
+        return " ".join(self.parts)[:self.max_chars]
+
+
+class CachedFetcher:
+    def __init__(self, cache_dir, ttl_sec=900, max_bytes=2_000_000, timeout=10, max_entries=512):
+        self.cache_dir = cache_dir
+        self.ttl_sec = ttl_sec
+        self.max_entries = max_entries
+        self.stores = 0
+        self.max_bytes = max_bytes
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=8, pool_maxsize=8)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers["User-Agent"] = USER_AGENT
+        self.lock = threading.Lock()
+        self.counters = {"hits": 0, "revalidated": 0, "misses": 0, "errors": 0, "bytes_downloaded": 0, "bytes_saved": 0, "pruned": 0}
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self.prune()
+
+    def _count(self, **deltas):
+        with self.lock:
+            for key, value in deltas.items():
+                self.counters[key] += value
+
+    def stats(self):
+        with self.lock:
+            out = dict(self.counters)
+        lookups = out["hits"] + out["revalidated"] + out["misses"]
+        out["hit_rate"] = round((out["hits"] + out["revalidated"]) / lookups, 3) if lookups else 0.0
+        return out
+
+    def _path(self, url):
+        return os.path.join(self.cache_dir, hashlib.sha256(url.encode("utf-8")).hexdigest() + ".json")
+
+    def _load(self, url):
+        try:
+            with open(self._path(url), "r") as f:
+                return json.load(f)
+        except Exception:
+            return None
+
+    def _store(self, url, entry):
+        tmp = self._path(url) + ".tmp"
+        try:
+            with open(tmp, "w") as f:
+                json.dump(entry, f)
+            os.replace(tmp, self._path(url))
+        except Exception as exc:
+            logging.error(f"Web cache write failed for {url}: {exc}")
+        with self.lock:
+            self.stores += 1
+            due = self.stores % PRUNE_EVERY == 0
+        if due:
+            self.prune()
+
+    def prune(self):
+        # mtime is the last fetch or revalidation, so it orders entries by recency without opening them.
+        now = time.time()
+        entries, stale = [], []
+        for name in os.listdir(self.cache_dir):
+            path = os.path.join(self.cache_dir, name)
+            try:
+                mtime = os.stat(path).st_mtime
+            except OSError:
+                continue
+            if not path.endswith(".tmp"):
+                entries.append((mtime, path))
+            elif mtime < now - STALE_TMP_SEC:
+                stale.append(path)
+        entries.sort(reverse=True)
+        horizon = now - self.ttl_sec * REVALIDATE_TTLS
+        removed = 0
+        doomed = stale + [path for rank, (mtime, path) in enumerate(entries) if rank >= self.max_entries or mtime < horizon]
+        for path in doomed:
+            try:
+                os.remove(path)
+                removed += 1
+            except OSError:
+                pass
+        self._count(pruned=removed)
+        return removed
+
+    def _stream_text(self, res, max_chars):
+        content_type = res.headers.get("Content-Type", "").lower()
+        try:
+            decoder = codecs.getincrementaldecoder(res.encoding or "utf-8")(errors="replace")
+        except LookupError:
+            # Servers do send charsets Python has never heard of; utf-8 with replacement beats failing the fetch.
+            decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        is_html = "html" in content_type or not content_type
+        extractor = TextExtractor(max_chars) if is_html else None
+        plain = []
+        plain_chars = 0
+        downloaded = 0
+        complete = True
+        for chunk in res.iter_content(chunk_size=16384):
+            downloaded += len(chunk)
+            text = decoder.decode(chunk)
+            if extractor is not None:
+                extractor.feed(text)
+                done = extractor.full
+            else:
+                plain.append(text)
+                plain_chars += len(text)
+                done = plain_chars >= max_chars
+            if done or downloaded >= self.max_bytes:
+                complete = False
+                break
+        if extractor is not None:
+            extractor.close()
+            body = extractor.text()
+        else:
+            body = WHITESPACE.sub(" ", "".join(plain)).strip()[:max_chars]
+        return body, downloaded, complete
+
+    def read_text(self, url, max_chars=5000):
+        now = time.time()
+        entry = self._load(url)
+        if entry and (entry.get("complete") or entry.get("max_chars", 0) >= max_chars):
+            if now - entry.get("fetched_at", 0) < self.ttl_sec:
+                self._count(hits=1, bytes_saved=entry.get("bytes", 0))
+                return entry["text"][:max_chars]
+        else:
+            entry = None
+
+        headers = {}
+        if entry:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+
+        try:
+            with self.session.get(url, headers=headers, timeout=self.timeout, stream=True) as res:
+                if res.status_code == 304 and entry:
+                    entry["fetched_at"] = now
+                    self._store(url, entry)
+                    self._count(revalidated=1, bytes_saved=entry.get("bytes", 0))
+                    return entry["text"][:max_chars]
+                text, downloaded, complete = self._stream_text(res, max_chars)
+                validators = {"etag": res.headers.get("ETag"), "last_modified": res.headers.get("Last-Modified")}
+                ok = res.ok
+        except Exception:
+            self._count(errors=1)
+            raise
+
+        self._count(misses=1, bytes_downloaded=downloaded)
+        if ok:
+            self._store(url, {
+                "url": url,
+                "text": text,
+                "bytes": downloaded,
+                "complete": complete,
+                "max_chars": max_chars,
+                "fetched_at": now,
+                **validators,
+            })
+        return text
@@ -0,0 +1,119 @@
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+
+# --- SEARCH LAYER (NORMALIZED CACHE + SINGLE-FLIGHT) ---
+QUERY_NOISE = re.compile(r"[^\w\s:/.+#-]+")
+WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_query(query):
+    q = QUERY_NOISE.sub(" ", (query or "").lower())
+    return WHITESPACE.sub(" ", q).strip(" .")
+
+
+class DDGSBackend:
+    def __init__(self):
+        self.ddg = None
+
+    def text(self, query, max_results=5):
+        if self.ddg is None:
+            from duckduckgo_search import DDGS
+            self.ddg = DDGS()
+        return list(self.ddg.text(query, max_results=max_results) or [])
+
+
+class LocalSearchBackend:
+    # Offline stand-in: answers from a JSON fixture ({"query": [{"title", "body", "href"}]}) or synthesizes results.
+    def __init__(self, fixtures_path=None, latency_sec=0.0):
+        self.latency_sec = latency_sec
+        self.calls = 0
+        self.fixtures = {}
+        if fixtures_path and os.path.exists(fixtures_path):
+            with open(fixtures_path, "r") as f:
+                self.fixtures = {normalize_query(k): v for k, v in json.load(f).items()}
+
+    def text(self, query, max_results=5):
+        self.calls += 1
+        if self.latency_sec:
+            time.sleep(self.latency_sec)
+        key = normalize_query(query)
+        if key in self.fixtures:
+            return self.fixtures[key][:max_results]
+        digest = hashlib.sha1(key.encode("utf-8")).hexdigest()[:8]
+        return [
+            {
+                "title": f"Local result {i + 1} for {key}",
+                "body": f"Offline stand-in content about {key}.",
+                "href": f"http://localhost/search/{digest}/{i + 1}",
+            }
+            for i in range(max_results)
+        ]
+
+
+def build_backend(name, fixtures_path=None):
+    if (name or "ddgs").strip().lower() == "local":
+        return LocalSearchBackend(fixtures_path)
+    return DDGSBackend()
+
+
+class SearchCache:
+    def __init__(self, backend, ttl_sec=600, max_entries=256):
+        self.backend = backend
+        self.ttl_sec = ttl_sec
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.inflight = {}
+        self.lock = threading.Lock()
+        self.counters = {"hits": 0, "misses": 0, "coalesced": 0, "errors": 0}
+
+    def stats(self):
+        with self.lock:
+            out = dict(self.counters)
+            out["entries"] = len(self.entries)
+            out["inflight"] = len(self.inflight)
+        lookups = out["hits"] + out["misses"] + out["coalesced"]
+        out["hit_rate"] = round((out["hits"] + out["coalesced"]) / lookups, 3) if lookups else 0.0
+        return out
+
+    def search(self, query, max_results=5):
+        key = (normalize_query(query), max_results)
+        now = time.time()
+        with self.lock:
+            cached = self.entries.get(key)
+            if cached and now - cached[0] < self.ttl_sec:
+                self.entries.move_to_end(key)
+                self.counters["hits"] += 1
+                return cached[1]
+            pending = self.inflight.get(key)
+            if pending is None:
+                pending = self.inflight[key] = Future()
+                leader = True
+                self.counters["misses"] += 1
+            else:
+                leader = False
+                self.counters["coalesced"] += 1
+        if not leader:
+            return pending.result()
+
+        try:
+            results = self.backend.text(query, max_results=max_results)
+        except Exception as exc:
+            with self.lock:
+                self.inflight.pop(key, None)
+                self.counters["errors"] += 1
+            pending.set_exception(exc)
+            raise
+        with self.lock:
+            self.inflight.pop(key, None)
+            self.entries[key] = (time.time(), results)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+        pending.set_result(results)
+        return results
@@ -0,0 +1,148 @@
+import gzip
+import json
+import os
+import threading
+import time
+
+from fastapi.responses import Response
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# --- RESPONSE ENCODING (FAST JSON, NEGOTIATED COMPRESSION, FIELD PROJECTION) ---
+COMPRESS_MIN_BYTES = 1024
+GZIP_LEVEL = 5
+BROTLI_QUALITY = 4
+
+
+def dumps(payload):
+    if orjson is not None:
+        return orjson.dumps(payload, option=orjson.OPT_NON_STR_KEYS, default=str)
+    return json.dumps(payload, default=str, separators=(",", ":")).encode("utf-8")
+
+
+def accepted_encodings(header):
+    accepted = set()
+    for part in (header or "").split(","):
+        token, _, params = part.strip().partition(";")
+        token = token.strip().lower()
+        if not token:
+            continue
+        q = params.strip()
+        if q.startswith("q="):
+            try:
+                if float(q[2:]) <= 0:
+                    continue
+            except ValueError:
+                continue
+        accepted.add(token)
+    return accepted
+
+
+def json_response(request, payload, status_code=200, headers=None):
+    # Serializes once with orjson when available, then compresses large bodies per Accept-Encoding.
+    body = dumps(payload)
+    out_headers = {"Vary": "Accept-Encoding"}
+    out_headers.update(headers or {})
+    if len(body) >= COMPRESS_MIN_BYTES:
+        accepted = accepted_encodings(request.headers.get("accept-encoding"))
+        if brotli is not None and "br" in accepted:
+            body = brotli.compress(body, quality=BROTLI_QUALITY)
+            out_headers["Content-Encoding"] = "br"
+        elif "gzip" in accepted:
+            body = gzip.compress(body, compresslevel=GZIP_LEVEL)
+            out_headers["Content-Encoding"] = "gzip"
+    return Response(content=body, status_code=status_code, media_type="application/json", headers=out_headers)
+
+
+def parse_fields(fields):
+    # "state.mood,trace,thoughts.id" -> {"state": ["mood"], "trace": None, "thoughts": ["id"]}; None keeps the whole section.
+    if not fields:
+        return None
+    spec = {}
+    for name in fields.split(","):
+        head, _, rest = name.strip().partition(".")
+        if not head:
+            continue
+        if not rest:
+            spec[head] = None
+        elif head not in spec:
+            spec[head] = [rest]
+        elif spec[head] is not None and rest not in spec[head]:
+            spec[head].append(rest)
+    return spec
+
+
+def wants(spec, section):
+    return spec is None or section in spec
+
+
+def project(value, keys):
+    if keys is None:
+        return value
+    if isinstance(value, dict):
+        return {k: value[k] for k in keys if k in value}
+    if isinstance(value, list):
+        return [project(item, keys) for item in value]
+    return value
+
+
+# --- VERSIONED SNAPSHOTS (FIELD-LEVEL DELTAS) ---
+def _detach(value):
+    # Builders may hand back live dicts (emotion drives); keep a private copy so later mutation still registers as change.
+    if isinstance(value, dict):
+        return {k: _detach(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_detach(v) for v in value]
+    return value
+
+
+class VersionedState:
+    def __init__(self, builder, min_refresh_sec=0.25):
+        self.builder = builder
+        self.min_refresh_sec = min_refresh_sec
+        self.lock = threading.Lock()
+        self.epoch = os.urandom(4).hex()
+        self.seq = 0
+        self.values = {}
+        self.changed_at = {}
+        self.refreshed_at = 0.0
+
+    def version(self):
+        return f"{self.epoch}.{self.seq}"
+
+    def _refresh(self):
+        # Concurrent dashboards polling inside the same window share one rebuild.
+        now = time.monotonic()
+        if self.refreshed_at and now - self.refreshed_at < self.min_refresh_sec:
+            return
+        self.refreshed_at = now
+        fresh = self.builder()
+        changed = [k for k, v in fresh.items() if k not in self.values or self.values[k] != v]
+        removed = [k for k in self.values if k not in fresh]
+        if not changed and not removed:
+            return
+        self.seq += 1
+        for key in changed:
+            self.values[key] = _detach(fresh[key])
+            self.changed_at[key] = self.seq
+        for key in removed:
+            del self.values[key]
+            del self.changed_at[key]
+
+    def since(self, token=""):
+        # Returns (version, fields, is_delta); an unknown or foreign-epoch token gets the full snapshot.
+        with self.lock:
+            self._refresh()
+            epoch, _, seq = (token or "").partition(".")
+            if epoch == self.epoch and seq.isdigit() and int(seq) <= self.seq:
+                base = int(seq)
+                return self.version(), {k: v for k, v in self.values.items() if self.changed_at[k] > base}, True
+            return self.version(), dict(self.values), False